@@ -0,0 +1,130 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Load test for the headless API against a local database.
+#
+# Starts the API in a uvicorn subprocess, optionally seeds the database and
+# hammers it with concurrent clients: kiosk-style conditional polls, paged
+# reads and batched submissions.
+#
+#   CORTADO_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.api_load --seed 100000
+
+# =============== // STANDARD IMPORT // ===============
+
+import argparse
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# =============== // LIBRARY IMPORT // ===============
+
+import requests
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado import Cortado
+from cortado.seed import seed
+
+RATING = {
+    "restaurant": {"name": "Load Test Café", "google_place_id": "load-test-place"},
+    "user": {"name": "load-tester"},
+    "rating": {"stars": 4, "price_zar": 35.0, "num_shots": "double"},
+}
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    # Its own processes, so the load generator doesn't fight it for the GIL
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "--factory", "cortado.api:create_app",
+        "--port", str(port), "--workers", str(workers), "--log-level", "warning"
+    ])
+    while True:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/statistics", timeout=1)
+            return server
+        except requests.ConnectionError:
+            time.sleep(0.2)
+
+
+def client(base: str, duration: float, batch_size: int, results: dict, lock: threading.Lock) -> None:
+    session = requests.Session()
+    etag = None
+    after = None
+    deadline = time.perf_counter() + duration
+    n = 0
+    while time.perf_counter() < deadline:
+        n += 1
+        if n % 20 == 0:
+            name = "POST /ratings/batch"
+            start = time.perf_counter()
+            response = session.post(f"{base}/ratings/batch", json=[RATING] * batch_size)
+        elif n % 2 == 0:
+            name = "GET /ratings (paged)"
+            start = time.perf_counter()
+            response = session.get(f"{base}/ratings", params={"limit": 100, **({"after": after} if after else {})})
+            after = response.json()["next"]
+        else:
+            name = "GET /statistics (If-None-Match)"
+            start = time.perf_counter()
+            response = session.get(f"{base}/statistics", headers={"If-None-Match": etag} if etag else {})
+            etag = response.headers.get("ETag", etag)
+        elapsed = time.perf_counter() - start
+        with lock:
+            results[name].append(elapsed)
+            results[f"status {response.status_code}"].append(elapsed)
+
+
+def percentile(values: list[float], p: float) -> float:
+    return statistics.quantiles(values, n=100)[p - 1] if len(values) > 1 else values[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="Seed this many fake ratings first")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(Cortado().db.engine, n_users=1_000, n_restaurants=5_000, n_ratings=args.seed)
+
+    server = start_server(args.port, args.workers)
+    base = f"http://127.0.0.1:{args.port}"
+    results = defaultdict(list)
+    lock = threading.Lock()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        for _ in range(args.clients):
+            pool.submit(client, base, args.duration, args.batch_size, results, lock)
+    wall = time.perf_counter() - start
+    server.terminate()
+
+    print(f"{args.clients} clients for {wall:.1f}s\n")
+    print(f"{'request':<34}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, values in sorted(results.items()):
+        print(
+            f"{name:<34}{len(values):>8}{len(values) / wall:>9.1f}"
+            f"{percentile(values, 50) * 1000:>9.1f}{percentile(values, 95) * 1000:>9.1f}"
+            f"{percentile(values, 99) * 1000:>9.1f}"
+        )
+    submitted = len(results["POST /ratings/batch"]) * args.batch_size
+    print(f"\nSubmitted {submitted} ratings ({submitted / wall:.1f} ratings/s)")
+
+
+if __name__ == "__main__":
+    main()
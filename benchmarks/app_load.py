@@ -0,0 +1,269 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Load test for the Streamlit pages, driven through AppTest.
+#
+# Dashboard sessions switch periods and poke the Data Table filters (all tabs
+# render on every run, so each run covers the map, analytics and the table).
+# Submitter sessions fill in pages/new_rating.py by hand and submit.
+#
+# AppTest swaps a process wide Runtime in and out on every run, so two of them
+# can't run at once in one process. Each session gets its own process instead,
+# which means st.cache_data is per session here, a pessimistic picture. Set
+# CORTADO_CACHE to let the sessions share the data cache the way replicas do.
+#
+# AppTest can't drive custom components either: the Google Maps search and the
+# star widget just return their defaults, so submissions go through the manual
+# location form. The page also sleeps 2s after a successful submission, which
+# caps one submitter at roughly 0.5 ratings/s.
+#
+#   CORTADO_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.app_load --sessions 8 --submitters 2
+
+# =============== // STANDARD IMPORT // ===============
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# =============== // LIBRARY IMPORT // ===============
+
+import psutil
+from sqlalchemy import event, func, select, text
+from sqlalchemy.pool import Pool
+from streamlit.testing.v1 import AppTest
+
+# =============== // MODULE IMPORT // ===============
+
+import constants as c
+import cortado.datastructures as DS
+from cortado import Cortado, Q
+from cortado.seed import seed
+
+NEW_RATING_PATH = c.PAGES_DIR / "new_rating.py"
+
+# Errors new_rating.py shows when a rating was not saved
+SUBMIT_ERRORS = ("❌ Please enter", "❌ Restaurant name", "Please try again")
+
+
+class Session:
+    # Everything one session process reports back to the parent
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.memory_mb = 0.0
+        self.submitted = 0
+        self.failed = 0
+        self.connections_opened = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        event.listen(Pool, "connect", self._on_connect)
+        event.listen(Pool, "checkout", self._on_checkout)
+        event.listen(Pool, "checkin", self._on_checkin)
+
+    def _on_connect(self, *args):
+        self.connections_opened += 1
+
+    def _on_checkout(self, *args):
+        self.checked_out += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, *args):
+        self.checked_out -= 1
+
+    def timed(self, name: str, at: AppTest) -> AppTest:
+        start = time.perf_counter()
+        at.run()
+        self.latencies[name].append(time.perf_counter() - start)
+        if at.exception:
+            self.errors[name] += 1
+        return at
+
+    def report(self) -> dict:
+        return {
+            "latencies": dict(self.latencies),
+            "errors": dict(self.errors),
+            "memory_mb": self.memory_mb,
+            "submitted": self.submitted,
+            "failed": self.failed,
+            "connections_opened": self.connections_opened,
+            "peak_checked_out": self.peak_checked_out,
+        }
+
+
+class BackendSampler(threading.Thread):
+    # Peak number of other backends Postgres sees on this database
+    def __init__(self, engine, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.interval = interval
+        self.peak = 0
+        # Not _stop, Thread.join() and is_alive() call their own _stop()
+        self._halt = threading.Event()
+
+    def run(self):
+        # Autocommit, pg_stat_activity is frozen for the length of a transaction
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            while not self._halt.wait(self.interval):
+                backends = connection.execute(text(
+                    "SELECT count(*) - 1 FROM pg_stat_activity WHERE datname = current_database()"
+                )).scalar()
+                self.peak = max(self.peak, backends)
+
+    def stop(self) -> None:
+        self._halt.set()
+
+
+def rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 1024 ** 2
+
+
+def browse(index: int, duration: float) -> dict:
+    session = Session()
+    rng = random.Random(index)
+    before = rss_mb()
+    at = session.timed("dashboard: first run", AppTest.from_file(str(c.MAIN_PATH), default_timeout=120))
+    session.memory_mb = rss_mb() - before
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        at.selectbox[0].select(rng.choice(list(Q.PERIODS)))
+        session.timed("dashboard: change period", at)
+
+        # An empty period has no Data Table to filter
+        if not at.multiselect:
+            continue
+        restaurants = at.multiselect[0]
+        restaurants.set_value(rng.sample(restaurants.options, k=min(2, len(restaurants.options))))
+        at.slider[0].set_value(rng.randint(1, 5))
+        at.checkbox[0].set_value(rng.random() < 0.5)
+        session.timed("dashboard: filter table", at)
+    return session.report()
+
+
+def submit(index: int, duration: float) -> dict:
+    session = Session()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        # A fresh page per rating, like a new visitor
+        before = rss_mb()
+        at = session.timed("new_rating: open page", AppTest.from_file(str(NEW_RATING_PATH), default_timeout=120))
+        session.memory_mb = max(session.memory_mb, rss_mb() - before)
+
+        _by_label(at.text_input, "Restaurant Name*").input(f"Load Test Café {index}")
+        _by_label(at.text_input, "Google Place Id").input(f"load-test-place-{index}")
+        _by_label(at.button, "📍 Save Location Details").click()
+        session.timed("new_rating: save location", at)
+
+        _by_label(at.text_input, "Your Name*").input(f"load-tester-{index}")
+        _by_label(at.number_input, "Price (ZAR)*").set_value(35.0)
+        _by_label(at.button, "🎯 Submit Rating").click()
+        session.timed("new_rating: submit", at)
+        # Only ratings the page accepted, failures are counted on their own
+        if _submit_failed(at):
+            session.failed += 1
+        else:
+            session.submitted += 1
+    return session.report()
+
+
+def _submit_failed(at: AppTest) -> bool:
+    # A saved rating reruns into a clean form, so there's no success message
+    # to look for. The Google Maps key error shows on every run without a key.
+    return bool(
+        at.exception
+        or at.warning  # The duplicate restaurant prompt
+        or any(e.value.startswith(SUBMIT_ERRORS) for e in at.error)
+    )
+
+
+def _by_label(elements, label: str):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"No '{label}' on the page")
+
+
+def percentile(values: list[float], p: int) -> float:
+    return statistics.quantiles(values, n=100)[p - 1] if len(values) > 1 else values[0]
+
+
+def count_ratings(cortado: Cortado) -> int:
+    with cortado.db.get_session() as session:
+        return session.scalar(select(func.count()).select_from(DS.Rating))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent dashboard sessions")
+    parser.add_argument("--submitters", type=int, default=2, help="Concurrent new rating sessions")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0, help="Seed this many fake ratings first")
+    args = parser.parse_args()
+
+    cortado = Cortado()
+    if args.seed:
+        seed(cortado.db.engine, n_users=1_000, n_restaurants=5_000, n_ratings=args.seed)
+    ratings_before = count_ratings(cortado)
+    sampler = BackendSampler(cortado.db.engine)
+    sampler.start()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.sessions + args.submitters) as pool:
+        futures = (
+            [pool.submit(browse, i, args.duration) for i in range(args.sessions)] +
+            [pool.submit(submit, i, args.duration) for i in range(args.submitters)]
+        )
+        reports = [future.result() for future in futures]
+    wall = time.perf_counter() - start
+    sampler.stop()
+    stored = count_ratings(cortado) - ratings_before
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for report in reports:
+        for name, values in report["latencies"].items():
+            latencies[name] += values
+        for name, count in report["errors"].items():
+            errors[name] += count
+
+    print(f"{args.sessions} dashboard + {args.submitters} submitter sessions for {wall:.1f}s\n")
+    print(f"{'script run':<28}{'count':>7}{'runs/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, values in sorted(latencies.items()):
+        print(
+            f"{name:<28}{len(values):>7}{len(values) / wall:>8.1f}"
+            f"{percentile(values, 50) * 1000:>9.0f}{percentile(values, 95) * 1000:>9.0f}"
+            f"{percentile(values, 99) * 1000:>9.0f}{errors[name]:>8}"
+        )
+
+    dashboards = [report["memory_mb"] for report in reports[:args.sessions]]
+    submitters = [report["memory_mb"] for report in reports[args.sessions:]]
+    print("\nMemory per session, growth over the first run (median / max)")
+    if dashboards:
+        print(f"  dashboard                          {statistics.median(dashboards):>7.1f} / {max(dashboards):.1f} MB")
+    if submitters:
+        print(f"  new rating                         {statistics.median(submitters):>7.1f} / {max(submitters):.1f} MB")
+
+    print("\nDatabase connections")
+    print(f"  opened by the pools                {sum(r['connections_opened'] for r in reports):>8}")
+    print(f"  peak checked out, summed           {sum(r['peak_checked_out'] for r in reports):>8}")
+    print(f"  peak backends (pg_stat_activity)   {sampler.peak:>8}")
+
+    submitted = sum(report["submitted"] for report in reports)
+    failed = sum(report["failed"] for report in reports)
+    print("\nSubmissions")
+    print(f"  submitted {submitted}, failed {failed}, stored {stored} ({stored / wall:.2f} ratings/s)")
+
+
+if __name__ == "__main__":
+    main()
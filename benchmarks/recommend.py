@@ -0,0 +1,130 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Fit, update and query times for cortado.recommend on synthetic ratings.
+#
+# No database needed. Restaurants sit in a handful of cities and each has a
+# style; users mostly rate places in their home city and like one style more
+# than the rest. As a sanity check, the share of recommendations in each
+# user's favourite style is compared with plain popularity (1 in 8 by chance).
+#
+#   python -m benchmarks.recommend --users 10000 --restaurants 50000
+
+# =============== // STANDARD IMPORT // ===============
+
+import argparse
+import statistics
+import time
+
+# =============== // LIBRARY IMPORT // ===============
+
+import numpy as np
+import pandas as pd
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado.recommend import Recommender
+
+CITIES = np.array([
+    (-33.92, 18.42), (-26.20, 28.04), (-29.86, 31.02), (-25.75, 28.19),
+    (-33.96, 25.60), (-29.12, 26.21), (-34.03, 23.05), (-33.59, 26.89),
+])
+STYLES = 8
+
+
+def fake_ratings(n_users: int, n_restaurants: int, per_user: int, rng: np.random.Generator):
+    city = rng.integers(len(CITIES), size=n_restaurants)
+    spread = rng.normal(scale=0.05, size=(n_restaurants, 2))
+    location = CITIES[city] + spread
+    style = rng.integers(STYLES, size=n_restaurants)
+    quality = rng.normal(size=n_restaurants)
+    by_city = [np.flatnonzero(city == c) for c in range(len(CITIES))]
+
+    home = rng.integers(len(CITIES), size=n_users)
+    taste = rng.integers(STYLES, size=n_users)
+    users, items = [], []
+    for user in range(n_users):
+        # Mostly the home city, now and then somewhere else
+        local = rng.choice(by_city[home[user]], size=int(per_user * 0.9))
+        away = rng.integers(n_restaurants, size=per_user - len(local))
+        users.append(np.full(per_user, user))
+        items.append(np.concatenate([local, away]))
+    users, items = np.concatenate(users), np.concatenate(items)
+
+    liking = 3 + 0.7 * quality[items] + 1.5 * (style[items] == taste[users]) - 0.4
+    stars = np.clip(np.rint(liking + rng.normal(scale=0.7, size=len(items))), 1, 5).astype(int)
+    ratings = pd.DataFrame({
+        "id": [f"{i:012d}" for i in range(len(items))],
+        "user_id": [f"user-{u}" for u in users],
+        "user_name": [f"user-{u}" for u in users],
+        "restaurant_id": [f"place-{i}" for i in items],
+        "restaurant_name": [f"Café {i}" for i in items],
+        "latitude": location[items, 0],
+        "longitude": location[items, 1],
+        "stars": stars,
+    })
+    return ratings, CITIES[home], taste, style
+
+
+def percentiles(values: list[float]) -> str:
+    q = statistics.quantiles(values, n=100)
+    return f"p50 {q[49] * 1000:6.2f} ms   p95 {q[94] * 1000:6.2f} ms   p99 {q[98] * 1000:6.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--restaurants", type=int, default=50_000)
+    parser.add_argument("--per-user", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    ratings, homes, taste, style = fake_ratings(args.users, args.restaurants, args.per_user, rng)
+    # Keep some ratings back to time incremental updates with
+    training, incoming = ratings.iloc[:-200], ratings.iloc[-200:]
+    print(f"{len(training):,} ratings, {args.users:,} users x {args.restaurants:,} restaurants\n")
+
+    start = time.perf_counter()
+    recommender = Recommender().fit(training)
+    print(f"fit                  {time.perf_counter() - start:8.2f} s")
+    size = sum(
+        m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in (recommender.stars, recommender.matrix)
+    ) + recommender.neighbour_index.nbytes + recommender.neighbour_weight.nbytes
+    print(f"matrices + neighbours{size / 1024 ** 2:8.1f} MB\n")
+
+    users = rng.integers(args.users, size=args.queries)
+    for label, near in (("recommend", False), ("recommend near", True)):
+        timings = []
+        for user in users:
+            start = time.perf_counter()
+            recommender.recommend(f"user-{user}", k=10, near=tuple(homes[user]) if near else None, radius_km=15)
+            timings.append(time.perf_counter() - start)
+        print(f"{label:<21}{percentiles(timings)}")
+
+    timings = []
+    for i in range(len(incoming)):
+        start = time.perf_counter()
+        recommender.update(incoming.iloc[[i]])
+        timings.append(time.perf_counter() - start)
+    print(f"{'update (1 rating)':<21}{percentiles(timings)}\n")
+
+    # Strangers only ever get the popularity ranking
+    for label, prefix in (("collaborative", "user-"), ("popularity only", "stranger-")):
+        matches = [
+            style[int(r["restaurant_id"].removeprefix("place-"))] == taste[user]
+            for user in users
+            for r in recommender.recommend(f"{prefix}{user}", k=10, near=tuple(homes[user]), radius_km=15)
+        ]
+        print(f"favourite style in top 10 ({label}){'':<{16 - len(label)}}{np.mean(matches):6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Compares table and index sizes of text ULID keys against 16 byte uuid keys.
+#
+# Seeds the old text-key schema into a scratch Postgres schema, measures it,
+# runs the real key migration and measures again. Only the key migration
+# runs, so indexes added by later changes don't show up in the sizes.
+#
+#   CORTADO_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.ulid_keys --ratings 1000000
+
+# =============== // STANDARD IMPORT // ===============
+
+import argparse
+import os
+import time
+from datetime import timedelta
+
+# =============== // LIBRARY IMPORT // ===============
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Integer, MetaData, Numeric, String, Table, Text,
+    create_engine, text
+)
+
+# =============== // MODULE IMPORT // ===============
+
+import cortado.datastructures as ds
+import cortado.queries as Q
+from cortado.migrations import migrate_ulid_keys
+from cortado.seed import seed
+
+SCHEMA = "cortado_bench"
+
+
+def legacy_tables() -> dict[str, Table]:
+    metadata = MetaData()
+
+    def stamped(name, *columns):
+        return Table(
+            name, metadata,
+            Column("id", String, primary_key=True, index=True),
+            Column("created_at", DateTime(timezone=True)),
+            Column("last_updated_at", DateTime(timezone=True)),
+            *columns
+        )
+
+    return {
+        "user": stamped(
+            "user",
+            Column("name", String(200), nullable=False),
+            Column("email", String(255), unique=True),
+        ),
+        "restaurant": stamped(
+            "restaurant",
+            Column("name", String(255), nullable=False),
+            Column("address", Text),
+            Column("google_place_id", String(100)),
+            Column("latitude", Numeric(10, 8)),
+            Column("longitude", Numeric(11, 8)),
+            Column("website", String(500)),
+            Column("restaurant_rating", Numeric(2, 1)),
+        ),
+        "rating": stamped(
+            "rating",
+            Column("user_id", String, ForeignKey("user.id"), nullable=False),
+            Column("restaurant_id", String, ForeignKey("restaurant.id"), nullable=False),
+            Column("stars", Integer, nullable=False),
+            Column("price_zar", Numeric(8, 2)),
+            Column("num_shots", String(50)),
+            Column("notes", Text),
+            Column("cookie", Boolean),
+            Column("take_away", Boolean),
+        ),
+    }
+
+
+def vacuum(engine) -> None:
+    # Compact both layouts the same way so only the key types differ
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM FULL ANALYZE"))
+
+
+def sizes(engine) -> dict[str, tuple[int, int]]:
+    with engine.connect() as connection:
+        return {
+            name: connection.execute(
+                text("SELECT pg_table_size(CAST(:t AS regclass)), pg_indexes_size(CAST(:t AS regclass))"),
+                {"t": f'"{name}"'}
+            ).one()
+            for name in ("user", "restaurant", "rating")
+        }
+
+
+def primary_key_size(engine) -> int:
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT pg_relation_size('rating_pkey')")).scalar()
+
+
+def since_query_ms(engine, repeat: int = 20) -> float:
+    stmt = Q.ratings_since_key(ds.utcnow() - timedelta(days=1))
+    with engine.connect() as connection:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            connection.execute(stmt).all()
+        return (time.perf_counter() - start) / repeat * 1000
+
+
+def report(label: str, measured: dict[str, tuple[int, int]]) -> None:
+    print(f"\n{label}")
+    print(f"{'table':<12}{'heap MB':>12}{'indexes MB':>14}")
+    for name, (heap, indexes) in measured.items():
+        print(f"{name:<12}{heap / 2**20:>12.1f}{indexes / 2**20:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ratings", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--restaurants", type=int, default=10_000)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        os.environ["CORTADO_DATABASE_URL"],
+        connect_args={"options": f"-csearch_path={SCHEMA}"}
+    )
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    tables = legacy_tables()
+    next(iter(tables.values())).metadata.create_all(engine)
+    start = time.perf_counter()
+    seed(engine, args.users, args.restaurants, args.ratings, tables=tables)
+    print(f"Seeded {args.ratings:,} ratings in {time.perf_counter() - start:.1f}s")
+
+    vacuum(engine)
+    before, pkey_before = sizes(engine), primary_key_size(engine)
+
+    # Tables the legacy schema never had, the migration looks at all of them
+    ds.Base.metadata.create_all(engine)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        migrate_ulid_keys(connection)
+    print(f"Migrated keys in {time.perf_counter() - start:.1f}s")
+
+    vacuum(engine)
+    after, pkey_after = sizes(engine), primary_key_size(engine)
+
+    report("Text ULID keys", before)
+    report("uuid ULID keys", after)
+    print(f"\n{'table':<12}{'heap saved':>12}{'indexes saved':>16}")
+    for name in before:
+        heap = 1 - after[name][0] / before[name][0]
+        indexes = 1 - after[name][1] / before[name][1]
+        print(f"{name:<12}{heap:>12.0%}{indexes:>16.0%}")
+    print(
+        f"\nrating primary key: {pkey_before / 2**20:.1f} MB -> {pkey_after / 2**20:.1f} MB "
+        f"({1 - pkey_after / pkey_before:.0%} saved)"
+    )
+    print(f"\n'since 1 day ago' key-range query: {since_query_ms(engine):.1f} ms")
+
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,74 +8,354 @@
 #
 # ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
 
+# =============== // STANDARD IMPORT // ===============
+
+import threading
+import time
+from datetime import datetime
+from typing import Iterator
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pandas as pd
+from ulid import ULID
+
 # =============== // MODULE IMPORT // ===============
 
 from cortado.db_utils import CortadoDB
 import cortado.datastructures as DS
 import cortado.input_dc as DC
+import cortado.queries as Q
+from cortado.export import BATCH_SIZE, export_chunks
+from cortado.notify import ChangeListener, publish
+from cortado.cache import RATINGS_VERSION, REWRITES_VERSION, SharedCache, bump_data_version, cache_from_env, get_data_version
+from cortado.migrations import has_extension
+from cortado.recommend import Recommender
+from cortado.search import DUPLICATE_THRESHOLD, DuplicateRestaurant, RestaurantIndex, UnknownRestaurant, duplicate_score, trigrams
+from cortado.snapshot import CATCH_UP_OVERLAP
+
+# Refit the recommender from scratch after this many incremental updates
+RECOMMENDER_REFIT_AFTER = 10_000
+
+# How often recommend() asks the database whether another replica wrote
+RECOMMENDER_CHECK_SECONDS = 5.0
+
+# Same again for the in-process restaurant search index
+SEARCH_CHECK_SECONDS = 5.0
 
 
 class Cortado:
     def __init__(self):
         self.db = CortadoDB()
+        self.cache = SharedCache(cache_from_env(self.db.engine))
+        self._recommender = None
+        self._recommender_version = None
+        self._recommender_rewrites = None
+        self._recommender_checked = 0.0
+        self._recommender_lock = threading.Lock()
+        self._trigram_search = None
+        self._search_index = None
+        self._search_version = None
+        self._search_rewrites = None
+        self._search_checked = 0.0
+        self._search_lock = threading.Lock()
+
+    def _add_rating(
+        self,
+        session,
+        restaurant: DC.Restaurant,
+        user: DC.User,
+        rating: DC.Rating,
+        allow_new_restaurant: bool = False
+    ) -> DS.Rating:
+        if restaurant.id:
+            # A malformed id can't match either, and would fail in ULIDKey
+            try:
+                ULID.from_str(restaurant.id)
+            except (TypeError, ValueError):
+                raise UnknownRestaurant(restaurant.id)
+            db_restaurant = session.get(DS.Restaurant, restaurant.id)
+            if not db_restaurant:
+                raise UnknownRestaurant(restaurant.id)
+        elif restaurant.google_place_id:
+            db_restaurant = session.scalars(Q.restaurant_by_place_id(restaurant.google_place_id)).first()
+        else:
+            db_restaurant = session.scalars(Q.manual_restaurant_by_name(restaurant.name)).first()
+        if not db_restaurant:
+            if not restaurant.google_place_id and not allow_new_restaurant:
+                candidates = self._similar_restaurants(session, restaurant.name)
+                if candidates:
+                    raise DuplicateRestaurant(restaurant.name, candidates)
+            db_restaurant = DS.Restaurant(
+                name=restaurant.name,
+                address=restaurant.address,
+                google_place_id=restaurant.google_place_id,
+                latitude=restaurant.latitude,
+                longitude=restaurant.longitude,
+                website=restaurant.website,
+                restaurant_rating=restaurant.restaurant_rating
+            )
+            session.add(db_restaurant)
+            session.flush()
+
+        db_user = session.scalars(Q.user_by_name(user.name)).first()
+        if not db_user:
+            db_user = DS.User(
+                name=user.name,
+                email=user.email
+            )
+            session.add(db_user)
+            session.flush()
+
+        db_rating = DS.Rating(
+            stars=rating.stars,
+            price_zar=rating.price_zar,
+            notes=rating.notes,
+            cookie=rating.cookie,
+            take_away=rating.take_away,
+            num_shots=rating.num_shots,
+            restaurant_id=db_restaurant.id,
+            user_id=db_user.id
+        )
+        session.add(db_rating)
+        session.flush()
+        return db_rating
 
     def new_rating(
         self,
         restaurant=DC.Restaurant,
         user=DC.User,
-        rating=DC.Rating
+        rating=DC.Rating,
+        allow_new_restaurant: bool = False
     ):
+        # Raises DuplicateRestaurant rather than adding a restaurant without a
+        # place id that looks like one we have, unless allow_new_restaurant
         with self.db.get_session() as session:
             try:
-                db_restaurant = session.query(DS.Restaurant).filter_by(
-                    google_place_id=restaurant.google_place_id
-                ).first()
-                if not db_restaurant:
-                    db_restaurant = DS.Restaurant(
-                        name=restaurant.name,
-                        address=restaurant.address,
-                        google_place_id=restaurant.google_place_id,
-                        latitude=restaurant.latitude,
-                        longitude=restaurant.longitude,
-                        website=restaurant.website,
-                        restaurant_rating=restaurant.restaurant_rating
-                    )
-                    session.add(db_restaurant)
-                    session.commit()
-
-                db_user = session.query(DS.User).filter_by(
-                    name=user.name
-                ).first()
-                if not db_user:
-                    db_user = DS.User(
-                        name=user.name,
-                        email=user.email
-                    )
-                    session.add(db_user)
-                    session.commit()
-
-                db_rating = DS.Rating(
-                    stars=rating.stars,
-                    price_zar=rating.price_zar,
-                    notes=rating.notes,
-                    cookie=rating.cookie,
-                    take_away=rating.take_away,
-                    num_shots=rating.num_shots,
-                    restaurant_id=db_restaurant.id,
-                    user_id=db_user.id
+                db_rating = self._add_rating(session, restaurant, user, rating, allow_new_restaurant)
+                publish(
+                    session,
+                    "rating",
+                    version=bump_data_version(session),
+                    id=db_rating.id,
+                    restaurant_id=db_rating.restaurant_id,
+                    user_id=db_rating.user_id
                 )
-                session.add(db_rating)
                 session.commit()
             except Exception:
                 session.rollback()
                 raise
+        # Our own writes show up in the next recommendation and search straight away
+        self._recommender_checked = 0.0
+        self._search_checked = 0.0
 
         return rating
 
+    def new_ratings(
+        self,
+        ratings: list[tuple[DC.Restaurant, DC.User, DC.Rating]],
+        allow_new_restaurant: bool = False
+    ) -> list[str]:
+        # All or nothing, with a single version bump and notification
+        with self.db.get_session() as session:
+            try:
+                ids = [
+                    self._add_rating(session, restaurant, user, rating, allow_new_restaurant).id
+                    for restaurant, user, rating in ratings
+                ]
+                publish(
+                    session,
+                    "rating",
+                    version=bump_data_version(session),
+                    count=len(ids)
+                )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+        # Our own writes show up in the next recommendation and search straight away
+        self._recommender_checked = 0.0
+        self._search_checked = 0.0
+        return ids
+
+    def data_version(self, name: str = RATINGS_VERSION) -> int:
+        with self.db.get_session() as session:
+            return get_data_version(session, name)
+
+    def change_listener(self) -> ChangeListener:
+        return ChangeListener(self.db.engine)
+
+    def get_ratings(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after_id: str | None = None,
+        limit: int | None = None,
+        **filters
+    ) -> list[dict]:
+        stmt = Q.ratings_join(since=since, until=until, after_id=after_id, **filters)
+        if limit is not None:
+            # Keyset pagination: pass the last id back in as after_id
+            if after_id is None:
+                stmt = stmt.order_by(DS.Rating.id)
+            stmt = stmt.limit(limit)
+        with self.db.get_session() as session:
+            return [dict(row) for row in session.execute(stmt).mappings()]
+
+    def get_statistics(self, since: datetime | None = None) -> dict:
+        with self.db.get_session() as session:
+            return dict(session.execute(Q.statistics(since=since)).mappings().one())
+
+    def get_restaurant_summary(self, restaurant_id: str) -> dict | None:
+        with self.db.get_session() as session:
+            row = session.execute(Q.restaurant_summary(restaurant_id)).mappings().one_or_none()
+            return dict(row) if row else None
+
+    def get_user_summary(self, user_id: str) -> dict | None:
+        with self.db.get_session() as session:
+            row = session.execute(Q.user_summary(user_id)).mappings().one_or_none()
+            return dict(row) if row else None
+
+    def get_rating_trend(
+        self,
+        restaurant_id: str | None = None,
+        user_id: str | None = None,
+        period: str = "month"
+    ) -> list[dict]:
+        stmt = Q.rating_trend(restaurant_id=restaurant_id, user_id=user_id, period=period)
+        with self.db.get_session() as session:
+            return [dict(row) for row in session.execute(stmt).mappings()]
+
+    def get_shot_mix(self, restaurant_id: str | None = None, user_id: str | None = None) -> list[dict]:
+        with self.db.get_session() as session:
+            result = session.execute(Q.shot_mix(restaurant_id=restaurant_id, user_id=user_id))
+            return [dict(row) for row in result.mappings()]
+
+    def get_restaurants(self, after_id: str | None = None) -> list[dict]:
+        with self.db.get_session() as session:
+            return [dict(row) for row in session.execute(Q.restaurant_options(after_id=after_id)).mappings()]
+
+    def get_users(self) -> list[dict]:
+        with self.db.get_session() as session:
+            return [dict(row) for row in session.execute(Q.user_options()).mappings()]
+
+    def _rating_matrix(self, after_id: str | None = None) -> pd.DataFrame:
+        with self.db.get_session() as session:
+            result = session.execute(Q.rating_matrix(after_id=after_id))
+            return pd.DataFrame(result.all(), columns=list(result.keys()))
+
+    def recommender(self) -> Recommender:
+        # Fitted on first use, then kept current by folding in new ratings
+        with self._recommender_lock:
+            recommender = self._recommender
+            if recommender and time.monotonic() - self._recommender_checked < RECOMMENDER_CHECK_SECONDS:
+                return recommender
+            version = self.data_version()
+            # Merged or moved restaurants can't be folded in, only refitted
+            rewrites = self.data_version(REWRITES_VERSION)
+            if (
+                not recommender
+                or not recommender.last_id
+                or recommender.updates > RECOMMENDER_REFIT_AFTER
+                or rewrites != self._recommender_rewrites
+            ):
+                self._recommender = Recommender().fit(self._rating_matrix())
+            elif version != self._recommender_version:
+                recommender.update(self._rating_matrix(after_id=recommender.catch_up_id()))
+            self._recommender_version = version
+            self._recommender_rewrites = rewrites
+            self._recommender_checked = time.monotonic()
+            return self._recommender
+
+    def recommend(
+        self,
+        user: str | DC.User,
+        k: int = 10,
+        near: tuple[float, float] | None = None,
+        radius_km: float = 10.0
+    ) -> list[dict]:
+        # `user` is a user id, or a DC.User looked up by name like new_rating does
+        recommender = self.recommender()
+        user_id = recommender.user_by_name.get(user.name) if isinstance(user, DC.User) else user
+        return recommender.recommend(user_id, k=k, near=near, radius_km=radius_km)
+
+    def _uses_trigram_search(self) -> bool:
+        # pg_trgm is optional, see cortado.migrations.enable_trigram_search
+        if self._trigram_search is None:
+            with self.db.engine.connect() as connection:
+                self._trigram_search = (
+                    connection.dialect.name == "postgresql" and has_extension(connection, "pg_trgm")
+                )
+        return self._trigram_search
+
+    def search_index(self) -> RestaurantIndex:
+        # Built on first use, then topped up with restaurants added since
+        with self._search_lock:
+            index = self._search_index
+            if index and time.monotonic() - self._search_checked < SEARCH_CHECK_SECONDS:
+                return index
+            version = self.data_version()
+            rewrites = self.data_version(REWRITES_VERSION)
+            if not index or rewrites != self._search_rewrites:
+                index = RestaurantIndex().add(self.get_restaurants())
+            elif version != self._search_version and index.last_id:
+                # ULIDs are minted before commit, so re-read a little way back
+                after_id = DS.ulid_floor(ULID.from_str(index.last_id).datetime - CATCH_UP_OVERLAP)
+                index.add(self.get_restaurants(after_id=after_id))
+            self._search_index = index
+            self._search_version = version
+            self._search_rewrites = rewrites
+            self._search_checked = time.monotonic()
+            return index
+
+    def suggest_restaurants(self, prefix: str, limit: int = 10) -> list[dict]:
+        # Typeahead for the manual entry form, best match first
+        if not prefix.strip():
+            return []
+        if self._uses_trigram_search():
+            with self.db.get_session() as session:
+                return [dict(row) for row in session.execute(Q.suggest_restaurants(prefix, limit)).mappings()]
+        return self.search_index().suggest(prefix, limit=limit)
+
+    def _similar_restaurants(self, session, name: str) -> list[dict]:
+        if not self._uses_trigram_search():
+            return self.search_index().duplicates(name)
+        grams = trigrams(name)
+        candidates = [
+            {**row, "score": duplicate_score(grams, trigrams(row["name"]))}
+            for row in session.execute(Q.similar_restaurants(name)).mappings()
+        ]
+        candidates = [c for c in candidates if c["score"] >= DUPLICATE_THRESHOLD]
+        return sorted(candidates, key=lambda c: -c["score"])[:5]
+
+    def similar_restaurants(self, name: str) -> list[dict]:
+        # Restaurants that `name` is likely a duplicate of
+        with self.db.get_session() as session:
+            return self._similar_restaurants(session, name)
+
+    def get_ratings_since_key(self, ts: datetime) -> list[dict]:
+        with self.db.get_session() as session:
+            result = session.execute(Q.ratings_since_key(ts))
+            return [dict(row) for row in result.mappings()]
+
+    def export_ratings(
+        self,
+        fmt: str = "csv",
+        batch_size: int = BATCH_SIZE,
+        **filters
+    ) -> Iterator[bytes]:
+        # Yields the file in chunks while the server side cursor is read, so
+        # memory stays flat no matter how many ratings match
+        with self.db.get_session() as session:
+            yield from export_chunks(session, Q.ratings_join(**filters), fmt=fmt, batch_size=batch_size)
+
 
 __all__ = [
     "Cortado",
+    "DuplicateRestaurant",
+    "UnknownRestaurant",
     "get_cortado_instance",
     "DS",
-    "DC"
+    "DC",
+    "Q"
 ]
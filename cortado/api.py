@@ -0,0 +1,327 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Headless HTTP API over the Cortado package, for bots and kiosk displays.
+#
+#   uvicorn --factory cortado.api:create_app --port 8081
+#   python -m cortado.api
+
+# =============== // STANDARD IMPORT // ===============
+
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+from hashlib import sha1
+
+# =============== // LIBRARY IMPORT // ===============
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from ulid import ULID
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado import Cortado, DC, Q
+from cortado.search import DuplicateRestaurant, UnknownRestaurant
+from cortado.export import FORMATS
+
+MAX_PAGE_SIZE = 500
+DEFAULT_PAGE_SIZE = 100
+MAX_BATCH_SIZE = 500
+
+# What the rating columns can hold, price_zar is Numeric(8, 2)
+MAX_PRICE_ZAR = 1_000_000
+# Text fields and their String() lengths, None for Text columns
+TEXT_FIELDS = {
+    "restaurant": {"name": 255, "address": None, "google_place_id": 100, "website": 500},
+    "user": {"name": 200, "email": 255},
+    "rating": {"num_shots": 50, "notes": None},
+}
+# Longer windows overflow timedelta, a hundred years is all of it anyway
+MAX_DAYS = 36_500
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class CortadoJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return json.dumps(content, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class BadRequest(Exception):
+    pass
+
+
+class DataVersion:
+    # Keeps the current data version in memory when Postgres can push changes
+    # to us, so unchanged polls are answered without touching the database
+
+    def __init__(self, cortado: Cortado):
+        self._cortado = cortado
+        self._version = None
+        self._listener = cortado.change_listener()
+        self._listener.subscribe(self._on_change)
+        self._pushed = cortado.db.engine.dialect.name == "postgresql"
+        if self._pushed:
+            self._listener.start()
+
+    def _on_change(self, change: dict) -> None:
+        self._version = change.get("version")
+
+    def invalidate(self) -> None:
+        # Our own writes must show up straight away, not when NOTIFY arrives
+        self._version = None
+
+    def get(self) -> int:
+        if not self._pushed or self._version is None:
+            self._version = self._cortado.data_version()
+        return self._version
+
+    def close(self) -> None:
+        self._listener.stop()
+
+
+def _etag(request: Request, version: int, since: datetime | None = None) -> str:
+    resource = f"{request.url.path}?{request.url.query}"
+    # A days= window slides even when no data changes, so its start hour is
+    # part of the tag too
+    window = f"-{since:%Y%m%d%H}" if since else ""
+    return f'W/"{version}{window}-{sha1(resource.encode()).hexdigest()[:16]}"'
+
+
+async def _conditional(request: Request, build, since: datetime | None = None) -> Response:
+    version = await run_in_threadpool(request.app.state.version.get)
+    etag = _etag(request, version, since)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    content = await run_in_threadpool(build)
+    if content is None:
+        return CortadoJSONResponse({"error": "Not found"}, status_code=404)
+    return CortadoJSONResponse(content, headers=headers)
+
+
+def _days(request: Request) -> int | None:
+    days = request.query_params.get("days")
+    if days is None:
+        return None
+    try:
+        days = int(days)
+    except ValueError:
+        raise BadRequest("'days' must be an integer")
+    if not 1 <= days <= MAX_DAYS:
+        raise BadRequest(f"'days' must be from 1 to {MAX_DAYS}")
+    return days
+
+
+def _limit(request: Request, default: int, maximum: int) -> int:
+    # Anything above the maximum is cut down to it
+    try:
+        limit = int(request.query_params.get("limit", default))
+    except ValueError:
+        raise BadRequest("'limit' must be an integer")
+    if limit < 1:
+        raise BadRequest(f"'limit' must be from 1 to {maximum}")
+    return min(limit, maximum)
+
+
+def _parse_rating(item: dict) -> tuple[DC.Restaurant, DC.User, DC.Rating]:
+    try:
+        restaurant = DC.Restaurant(**item["restaurant"])
+        user = DC.User(**item["user"])
+        rating = DC.Rating(**item["rating"])
+    except (KeyError, TypeError) as e:
+        raise BadRequest(f"Invalid rating payload: {e}")
+    for section, parsed in (("restaurant", restaurant), ("user", user), ("rating", rating)):
+        for field, max_length in TEXT_FIELDS[section].items():
+            value = getattr(parsed, field)
+            # Only the names are required
+            if value is None and field != "name":
+                continue
+            if (
+                not isinstance(value, str)
+                or (field == "name" and not value.strip())
+                or (max_length is not None and len(value) > max_length)
+            ):
+                limit = f" of at most {max_length} characters" if max_length else ""
+                raise BadRequest(f"'{section}.{field}' must be text{limit}")
+    if restaurant.id is not None and (not isinstance(restaurant.id, str) or not _is_ulid(restaurant.id)):
+        raise BadRequest("'restaurant.id' must be a restaurant id")
+    for field in ("cookie", "take_away"):
+        if not isinstance(getattr(rating, field), bool):
+            raise BadRequest(f"'{field}' must be true or false")
+    # bool is an int too
+    if not isinstance(rating.stars, int) or isinstance(rating.stars, bool) or not 1 <= rating.stars <= 5:
+        raise BadRequest("'stars' must be a whole number from 1 to 5")
+    if rating.price_zar is not None and (
+        not isinstance(rating.price_zar, (int, float)) or isinstance(rating.price_zar, bool)
+        or not 0 <= rating.price_zar < MAX_PRICE_ZAR
+    ):
+        raise BadRequest(f"'price_zar' must be a number from 0 to {MAX_PRICE_ZAR}")
+    return restaurant, user, rating
+
+
+def _is_ulid(value: str) -> bool:
+    try:
+        ULID.from_str(value)
+    except ValueError:
+        return False
+    return True
+
+
+async def _json_body(request: Request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise BadRequest("Request body must be JSON")
+
+
+# =============== // ENDPOINTS // ===============
+
+
+def _allow_new_restaurant(request: Request) -> bool:
+    # Resend with ?allow_new_restaurant=true after a 409 to add it anyway
+    return request.query_params.get("allow_new_restaurant", "").lower() in ("1", "true")
+
+
+async def create_rating(request: Request) -> Response:
+    item = _parse_rating(await _json_body(request))
+    [rating_id] = await run_in_threadpool(
+        request.app.state.cortado.new_ratings, [item], _allow_new_restaurant(request)
+    )
+    request.app.state.version.invalidate()
+    return CortadoJSONResponse({"id": rating_id}, status_code=201)
+
+
+async def create_ratings_batch(request: Request) -> Response:
+    body = await _json_body(request)
+    if not isinstance(body, list) or not 0 < len(body) <= MAX_BATCH_SIZE:
+        raise BadRequest(f"Expected a list of 1 to {MAX_BATCH_SIZE} ratings")
+    items = [_parse_rating(item) for item in body]
+    ids = await run_in_threadpool(request.app.state.cortado.new_ratings, items, _allow_new_restaurant(request))
+    request.app.state.version.invalidate()
+    return CortadoJSONResponse({"ids": ids}, status_code=201)
+
+
+async def list_ratings(request: Request) -> Response:
+    params = request.query_params
+    limit = _limit(request, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    try:
+        min_stars = int(params["min_stars"]) if "min_stars" in params else None
+    except ValueError:
+        raise BadRequest("'min_stars' must be an integer")
+    after = params.get("after")
+    if after is not None and not _is_ulid(after):
+        raise BadRequest("'after' must be a rating id")
+    since = Q.since_days(_days(request))
+
+    def build():
+        items = request.app.state.cortado.get_ratings(
+            since=since,
+            after_id=after,
+            limit=limit,
+            restaurants=params.getlist("restaurant") or None,
+            min_stars=min_stars
+        )
+        return {
+            "items": items,
+            "next": items[-1]["id"] if len(items) == limit else None
+        }
+    return await _conditional(request, build, since)
+
+
+async def statistics(request: Request) -> Response:
+    since = Q.since_days(_days(request))
+    return await _conditional(request, lambda: request.app.state.cortado.get_statistics(since=since), since)
+
+
+async def restaurant_summary(request: Request) -> Response:
+    restaurant_id = request.path_params["restaurant_id"]
+    if not _is_ulid(restaurant_id):
+        return CortadoJSONResponse({"error": "Not found"}, status_code=404)
+    return await _conditional(
+        request,
+        lambda: request.app.state.cortado.get_restaurant_summary(restaurant_id)
+    )
+
+
+async def suggest_restaurants(request: Request) -> Response:
+    query = request.query_params.get("q", "")
+    limit = _limit(request, 10, 50)
+    return await _conditional(request, lambda: request.app.state.cortado.suggest_restaurants(query, limit=limit))
+
+
+async def export_ratings(request: Request) -> Response:
+    fmt = request.query_params.get("format", "csv")
+    if fmt not in FORMATS:
+        raise BadRequest(f"'format' must be one of {list(FORMATS)}")
+    # Starlette drains the sync generator in a worker thread, so bytes go out
+    # while the server side cursor is still being read
+    chunks = request.app.state.cortado.export_ratings(fmt=fmt, since=Q.since_days(_days(request)))
+    return StreamingResponse(
+        chunks,
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="cortado_ratings.{fmt}"'}
+    )
+
+
+async def bad_request(request: Request, exc: BadRequest) -> Response:
+    return CortadoJSONResponse({"error": str(exc)}, status_code=400)
+
+
+async def unknown_restaurant(request: Request, exc: UnknownRestaurant) -> Response:
+    # The id came in the request body, so it's a bad request rather than a 404
+    return CortadoJSONResponse({"error": str(exc)}, status_code=400)
+
+
+async def duplicate_restaurant(request: Request, exc: DuplicateRestaurant) -> Response:
+    return CortadoJSONResponse({"error": str(exc), "candidates": exc.candidates}, status_code=409)
+
+
+def create_app(cortado: Cortado | None = None) -> Starlette:
+    app = Starlette(
+        routes=[
+            Route("/ratings", create_rating, methods=["POST"]),
+            Route("/ratings", list_ratings, methods=["GET"]),
+            Route("/ratings/batch", create_ratings_batch, methods=["POST"]),
+            Route("/ratings/export", export_ratings, methods=["GET"]),
+            Route("/statistics", statistics, methods=["GET"]),
+            Route("/restaurants/suggest", suggest_restaurants, methods=["GET"]),
+            Route("/restaurants/{restaurant_id}/summary", restaurant_summary, methods=["GET"]),
+        ],
+        exception_handlers={
+            BadRequest: bad_request,
+            UnknownRestaurant: unknown_restaurant,
+            DuplicateRestaurant: duplicate_restaurant
+        },
+    )
+    app.state.cortado = cortado or Cortado()
+    app.state.version = DataVersion(app.state.cortado)
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(
+        "cortado.api:create_app",
+        factory=True,
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8081"))
+    )
@@ -0,0 +1,270 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+import io
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Callable
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import Engine, delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+# =============== // MODULE IMPORT // ===============
+
+import cortado.datastructures as ds
+
+logger = logging.getLogger(__name__)
+
+RATINGS_VERSION = "ratings"
+# Bumped (as well) by writes that change or delete existing rows, which an
+# "everything after the last id" catch-up can't see
+REWRITES_VERSION = "rewrites"
+
+# =============== // DATA VERSION // ===============
+
+
+def bump_data_version(session: Session, name: str = RATINGS_VERSION) -> int:
+    if session.get_bind().dialect.name != "postgresql":
+        # on_conflict_do_update is Postgres only, elsewhere (SQLite in tests)
+        # read the row under lock and update it
+        row = session.get(ds.DataVersion, name, with_for_update=True)
+        if row is None:
+            row = ds.DataVersion(name=name, version=0)
+            session.add(row)
+        row.version += 1
+        row.last_updated_at = ds.utcnow()
+        session.flush()
+        return row.version
+    stmt = insert(ds.DataVersion).values(name=name, version=1, last_updated_at=ds.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ds.DataVersion.name],
+        set_={"version": ds.DataVersion.version + 1, "last_updated_at": ds.utcnow()}
+    ).returning(ds.DataVersion.version)
+    return session.execute(stmt).scalar_one()
+
+
+def get_data_version(session: Session, name: str = RATINGS_VERSION) -> int:
+    version = session.execute(
+        select(ds.DataVersion.version).where(ds.DataVersion.name == name)
+    ).scalar_one_or_none()
+    return version or 0
+
+
+# =============== // CODECS // ===============
+
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    # Arrow IPC with zstd: typed, compact and much faster than pickle
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def decode_frame(data: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+
+def encode_json(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, default=str).encode())
+
+
+def decode_json(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data))
+
+
+CODECS: dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "frame": (encode_frame, decode_frame),
+    "json": (encode_json, decode_json),
+    "bytes": (bytes, bytes),
+}
+
+# =============== // BACKENDS // ===============
+
+# FileCache and PostgresCache sweep expired entries at most this often (seconds)
+PURGE_INTERVAL = 60.0
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        ...
+
+
+class FileCache(CacheBackend):
+    # Works across replicas when the directory is a shared volume
+
+    def __init__(self, directory: str | Path, purge_interval: float = PURGE_INTERVAL):
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._purge_interval = purge_interval
+        self._last_purge = 0.0
+
+    def _path(self, key: str) -> Path:
+        return self._directory / sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        (expires_at,) = struct.unpack_from(">d", data)
+        if expires_at < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return data[8:]
+
+    def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        expires_at = time.time() + ttl if ttl else float("inf")
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(struct.pack(">d", expires_at) + value)
+        # Readers either see the old file or the new one, never half of it
+        os.replace(tmp, path)
+        if time.monotonic() - self._last_purge >= self._purge_interval:
+            self._purge()
+
+    def _purge(self) -> None:
+        # Entries for old data versions are never read again
+        self._last_purge = time.monotonic()
+        now = time.time()
+        for path in self._directory.iterdir():
+            try:
+                with path.open("rb") as f:
+                    (expires_at,) = struct.unpack(">d", f.read(8))
+                if expires_at < now:
+                    path.unlink(missing_ok=True)
+            except (OSError, struct.error):
+                continue
+
+
+class PostgresCache(CacheBackend):
+
+    def __init__(self, engine: Engine, purge_interval: float = PURGE_INTERVAL):
+        self._engine = engine
+        self._purge_interval = purge_interval
+        self._last_purge = 0.0
+
+    def get(self, key: str) -> bytes | None:
+        with Session(self._engine) as session:
+            entry = session.get(ds.CacheEntry, key)
+            if entry is None:
+                return None
+            if entry.expires_at is not None and entry.expires_at < ds.utcnow():
+                session.execute(delete(ds.CacheEntry).where(ds.CacheEntry.key == key))
+                session.commit()
+                return None
+            return entry.value
+
+    def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        expires_at = ds.utcnow() + timedelta(seconds=ttl) if ttl else None
+        stmt = insert(ds.CacheEntry).values(key=key, value=value, expires_at=expires_at)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ds.CacheEntry.key],
+            set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at}
+        )
+        with Session(self._engine) as session:
+            session.execute(stmt)
+            # Entries for old data versions are never read again. Finding them
+            # scans the table, so not on every set.
+            if time.monotonic() - self._last_purge >= self._purge_interval:
+                self._last_purge = time.monotonic()
+                session.execute(delete(ds.CacheEntry).where(ds.CacheEntry.expires_at < ds.utcnow()))
+            session.commit()
+
+
+class RedisCache(CacheBackend):
+    # Anything that speaks the redis-py get/set(ex=) API will do
+
+    def __init__(self, client):
+        self._client = client
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int | None = None) -> None:
+        self._client.set(key, value, ex=ttl)
+
+
+def cache_from_env(engine: Engine) -> CacheBackend | None:
+    # CORTADO_CACHE=postgres | file:/shared/dir | redis://host:6379/0
+    setting = os.getenv("CORTADO_CACHE")
+    if not setting:
+        return None
+    if setting == "postgres":
+        return PostgresCache(engine)
+    if setting.startswith("file:"):
+        return FileCache(setting.removeprefix("file:"))
+    if setting.startswith(("redis://", "rediss://")):
+        import redis
+        return RedisCache(redis.Redis.from_url(setting))
+    raise ValueError(f"Unknown CORTADO_CACHE backend '{setting}'")
+
+
+# =============== // SHARED CACHE // ===============
+
+
+class SharedCache:
+
+    def __init__(self, backend: CacheBackend | None, namespace: str = "cortado"):
+        self._backend = backend
+        self._namespace = namespace
+
+    def key(self, name: str, version: int) -> str:
+        return f"{self._namespace}:{name}:v{version}"
+
+    def get_or_compute(
+        self,
+        name: str,
+        version: int,
+        compute: Callable[[], Any],
+        codec: str = "json",
+        ttl: int | None = None
+    ) -> Any:
+        if self._backend is None:
+            return compute()
+
+        encode, decode = CODECS[codec]
+        key = self.key(name, version)
+        try:
+            data = self._backend.get(key)
+            if data is not None:
+                return decode(data)
+        except Exception:
+            logger.exception("Shared cache read failed for %s", key)
+
+        value = compute()
+        try:
+            self._backend.set(key, encode(value), ttl=ttl)
+        except Exception:
+            logger.exception("Shared cache write failed for %s", key)
+        return value
@@ -10,12 +10,49 @@
 
 # =============== // STANDARD IMPORT // ===============
 
-import time
-from sqlalchemy import String, Float, Numeric, Text, Integer, Boolean, ForeignKey
+from datetime import datetime, timezone
+from uuid import UUID
+
+# =============== // LIBRARY IMPORT // ===============
+
+from sqlalchemy import text, String, DateTime, Numeric, Text, Integer, BigInteger, Boolean, ForeignKey, Index, Uuid, LargeBinary
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from ulid import ULID
 
-# =============== // LIBRARY IMPORT // ===============
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def new_ulid() -> str:
+    return str(ULID())
+
+
+def ulid_floor(ts: datetime) -> str:
+    # Smallest ULID that can be generated at `ts`, handy as a key-range bound
+    millis = int(ts.timestamp() * 1000)
+    return str(ULID.from_bytes(millis.to_bytes(6, "big") + bytes(10)))
+
+
+class ULIDKey(TypeDecorator):
+    # Stored as a 16 byte uuid (native on Postgres), exposed as a ULID string.
+    # ULIDs sort by creation time and uuids compare bytewise, so key ranges
+    # stay time ordered in the index.
+    impl = Uuid
+    cache_ok = True
+
+    def process_bind_param(self, value: str | ULID | UUID | None, dialect) -> UUID | None:
+        if value is None or isinstance(value, UUID):
+            return value
+        if isinstance(value, str):
+            value = ULID.from_str(value)
+        return value.to_uuid()
+
+    def process_result_value(self, value: UUID | None, dialect) -> str | None:
+        if value is None:
+            return None
+        return str(ULID.from_uuid(value))
 
 
 class Base(DeclarativeBase):
@@ -25,13 +62,17 @@ class Base(DeclarativeBase):
 class TimeStampedModel(Base):
     __abstract__ = True
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(ULID()), index=True)
-    created_at: Mapped[float] = mapped_column(Float, default=time.time)
-    last_updated_at: Mapped[float] = mapped_column(Float, default=time.time, onupdate=time.time)
+    id: Mapped[str] = mapped_column(ULIDKey, primary_key=True, default=new_ulid)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    last_updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
 
 
 class User(TimeStampedModel):
     __tablename__ = "user"
+    __table_args__ = (
+        # new_rating finds the user by name on every write
+        Index("ix_user_name", "name"),
+    )
 
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=True)
@@ -41,6 +82,16 @@ class User(TimeStampedModel):
 
 class Restaurant(TimeStampedModel):
     __tablename__ = "restaurant"
+    __table_args__ = (
+        # new_rating's lookups, by place id or by the name typed in for a
+        # restaurant without one
+        Index("ix_restaurant_google_place_id", "google_place_id"),
+        Index(
+            "ix_restaurant_manual_name",
+            text("lower(name)"),
+            postgresql_where=text("google_place_id IS NULL")
+        ),
+    )
 
     # The obvious
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -48,12 +99,12 @@ class Restaurant(TimeStampedModel):
 
     # Location data
     google_place_id: Mapped[str] = mapped_column(String(100), nullable=True)
-    latitude: Mapped[float] = mapped_column(Numeric(precision=10, scale=8), nullable=True)
-    longitude: Mapped[float] = mapped_column(Numeric(precision=11, scale=8), nullable=True)
+    latitude: Mapped[float] = mapped_column(Numeric(precision=10, scale=8, asdecimal=False), nullable=True)
+    longitude: Mapped[float] = mapped_column(Numeric(precision=11, scale=8, asdecimal=False), nullable=True)
 
     # Additional data
     website: Mapped[str] = mapped_column(String(500), nullable=True)
-    restaurant_rating: Mapped[float] = mapped_column(Numeric(precision=2, scale=1), nullable=True)
+    restaurant_rating: Mapped[float] = mapped_column(Numeric(precision=2, scale=1, asdecimal=False), nullable=True)
 
     # Relationships
     ratings: Mapped[list["Rating"]] = relationship("Rating", back_populates="restaurant")
@@ -61,14 +112,23 @@ class Restaurant(TimeStampedModel):
 
 class Rating(TimeStampedModel):
     __tablename__ = "rating"
+    __table_args__ = (
+        # Ratings are append-only, so created_at follows the physical row order
+        # and a BRIN index stays tiny while still serving date-range filters.
+        Index("ix_rating_created_at", "created_at", postgresql_using="brin"),
+        # Back the foreign keys and the per-restaurant / per-user drill-downs,
+        # which read one entity's ratings in date order
+        Index("ix_rating_restaurant_id_created_at", "restaurant_id", "created_at"),
+        Index("ix_rating_user_id_created_at", "user_id", "created_at"),
+    )
 
     # Foreign keys
-    user_id: Mapped[str] = mapped_column(String, ForeignKey("user.id"), nullable=False)
-    restaurant_id: Mapped[str] = mapped_column(String, ForeignKey("restaurant.id"), nullable=False)
+    user_id: Mapped[str] = mapped_column(ULIDKey, ForeignKey("user.id"), nullable=False)
+    restaurant_id: Mapped[str] = mapped_column(ULIDKey, ForeignKey("restaurant.id"), nullable=False)
 
     # Rating data
     stars: Mapped[int] = mapped_column(Integer, nullable=False)
-    price_zar: Mapped[float] = mapped_column(Numeric(precision=8, scale=2), nullable=True)
+    price_zar: Mapped[float] = mapped_column(Numeric(precision=8, scale=2, asdecimal=False), nullable=True)
     num_shots: Mapped[str] = mapped_column(String(50), nullable=True)  # e.g., single, double
     notes: Mapped[str] = mapped_column(Text, nullable=True)
 
@@ -79,3 +139,21 @@ class Rating(TimeStampedModel):
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="ratings")
     restaurant: Mapped["Restaurant"] = relationship("Restaurant", back_populates="ratings")
+
+
+class DataVersion(Base):
+    # Bumped by every write so caches on any replica can tell when they are stale
+    __tablename__ = "data_version"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    last_updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+
+
+class CacheEntry(Base):
+    # Backing table for cortado.cache.PostgresCache
+    __tablename__ = "cache_entry"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    value: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
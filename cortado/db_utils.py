@@ -14,18 +14,24 @@ import os
 
 # =============== // LIBRARY IMPORT // ===============
 
-from sqlalchemy import create_engine, URL
+from sqlalchemy import create_engine, make_url, URL
 from sqlalchemy.orm import sessionmaker
 
 # =============== // MODULE IMPORT // ===============
 
 import cortado.datastructures as ds
+from cortado.migrations import run_migrations
 
 
 class CortadoDB:
     def __init__(self):
         self._engine = create_engine(self.object_url, echo=False)
         ds.Base.metadata.create_all(self._engine)
+        run_migrations(self._engine)
+
+    @property
+    def engine(self):
+        return self._engine
 
     def get_session(self):
         Session = sessionmaker(bind=self._engine)
@@ -33,6 +39,9 @@ class CortadoDB:
 
     @property
     def object_url(self):
+        # Handy for pointing at a local database for tests and benchmarks
+        if "CORTADO_DATABASE_URL" in os.environ:
+            return make_url(os.environ["CORTADO_DATABASE_URL"])
         return URL.create(
             "postgresql+psycopg2",
             username=os.environ["PSQL_USERNAME"],
@@ -0,0 +1,353 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Fills in the place id and location of manually entered restaurants.
+#
+# Incomplete restaurants are read in id order and looked up a batch at a time
+# on a small thread pool, sharing one rate limit. Each batch is written back
+# in a single transaction, and the last id written is checkpointed so a run
+# that dies half way picks up where it stopped. A restaurant that resolves to
+# a place we already have is merged into it, ratings and all.
+#
+#   CORTADO_GEOCODER=stub python -m cortado.enrich --checkpoint enrich.json
+
+# =============== // STANDARD IMPORT // ===============
+
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from hashlib import sha256
+from pathlib import Path
+
+# =============== // LIBRARY IMPORT // ===============
+
+from sqlalchemy import delete, select, update
+
+# =============== // MODULE IMPORT // ===============
+
+import cortado.datastructures as DS
+import cortado.queries as Q
+from cortado.cache import RATINGS_VERSION, REWRITES_VERSION, bump_data_version
+from cortado.notify import publish
+
+logger = logging.getLogger(__name__)
+
+PLACES_URL = "https://places.googleapis.com/v1/places:searchText"
+PLACES_FIELDS = "places.id,places.formattedAddress,places.location,places.websiteUri,places.rating"
+
+
+@dataclass
+class Place:
+    google_place_id: str
+    latitude: float
+    longitude: float
+    address: str | None = None
+    website: str | None = None
+    restaurant_rating: float | None = None
+
+
+@dataclass
+class EnrichResult:
+    resolved: int = 0
+    merged: int = 0
+    not_found: int = 0
+    failed: int = 0
+    last_id: str | None = None
+
+
+class RetryableError(Exception):
+    # Rate limited, timed out or a 5xx: worth another go after a pause
+    pass
+
+
+# =============== // GEOCODERS // ===============
+
+
+class Geocoder(ABC):
+    @abstractmethod
+    def lookup(self, name: str, address: str | None) -> Place | None:
+        ...
+
+
+class GooglePlacesGeocoder(Geocoder):
+    # Places API (New) text search, one best match per restaurant
+
+    def __init__(self, api_key: str, timeout: float = 10.0):
+        import requests
+        self._requests = requests
+        self._session = requests.Session()
+        self._session.headers.update({"X-Goog-Api-Key": api_key, "X-Goog-FieldMask": PLACES_FIELDS})
+        self._timeout = timeout
+
+    def lookup(self, name: str, address: str | None) -> Place | None:
+        query = f"{name}, {address}" if address else name
+        try:
+            response = self._session.post(
+                PLACES_URL,
+                json={"textQuery": query, "maxResultCount": 1},
+                timeout=self._timeout
+            )
+        except (self._requests.ConnectionError, self._requests.Timeout) as e:
+            raise RetryableError(str(e)) from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableError(f"{response.status_code} from Places API")
+        response.raise_for_status()
+        places = response.json().get("places")
+        if not places:
+            return None
+        place = places[0]
+        return Place(
+            google_place_id=place["id"],
+            latitude=place["location"]["latitude"],
+            longitude=place["location"]["longitude"],
+            address=place.get("formattedAddress"),
+            website=place.get("websiteUri"),
+            restaurant_rating=place.get("rating"),
+        )
+
+
+class StubGeocoder(Geocoder):
+    # For local runs and tests. Known names resolve to the given places, and
+    # with fabricate=True anything else gets a stable made-up place near
+    # Johannesburg, so the same name always lands on the same place.
+
+    def __init__(self, places: dict[str, Place] | None = None, fabricate: bool = True, latency: float = 0.0):
+        self._places = {name.casefold(): place for name, place in (places or {}).items()}
+        self._fabricate = fabricate
+        self._latency = latency
+
+    def lookup(self, name: str, address: str | None) -> Place | None:
+        if self._latency:
+            time.sleep(self._latency)
+        if name.casefold() in self._places:
+            return self._places[name.casefold()]
+        if not self._fabricate:
+            return None
+        digest = sha256(name.casefold().encode()).digest()
+        return Place(
+            google_place_id=f"stub-{digest[:12].hex()}",
+            latitude=-26.2041 + (digest[12] - 128) / 1000,
+            longitude=28.0473 + (digest[13] - 128) / 1000,
+            address=address,
+        )
+
+
+def geocoder_from_env() -> Geocoder:
+    # CORTADO_GEOCODER=google (needs GOOGLE_MAPS_API_KEY) | stub
+    setting = os.getenv("CORTADO_GEOCODER", "google")
+    if setting == "google":
+        return GooglePlacesGeocoder(os.environ["GOOGLE_MAPS_API_KEY"])
+    if setting == "stub":
+        return StubGeocoder()
+    raise ValueError(f"Unknown CORTADO_GEOCODER backend '{setting}'")
+
+
+# =============== // PLUMBING // ===============
+
+
+class RateLimiter:
+    # Spaces calls out evenly across every thread sharing it
+
+    def __init__(self, per_second: float):
+        self._interval = 1.0 / per_second if per_second else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+@dataclass
+class Checkpoint:
+    path: Path
+    result: EnrichResult = field(default_factory=EnrichResult)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Checkpoint":
+        path = Path(path)
+        try:
+            return cls(path, EnrichResult(**json.loads(path.read_text())))
+        except FileNotFoundError:
+            return cls(path)
+
+    def save(self) -> None:
+        # Written to the side and swapped in, so a crash never leaves half a file
+        with tempfile.NamedTemporaryFile("w", dir=self.path.parent, suffix=".tmp", delete=False) as f:
+            json.dump(asdict(self.result), f)
+        os.replace(f.name, self.path)
+
+
+def lookup_with_retries(
+    geocoder: Geocoder,
+    limiter: RateLimiter,
+    name: str,
+    address: str | None,
+    attempts: int = 4,
+    backoff: float = 0.5
+) -> Place | None:
+    for attempt in range(attempts):
+        limiter.wait()
+        try:
+            return geocoder.lookup(name, address)
+        except RetryableError:
+            if attempt == attempts - 1:
+                raise
+            # Exponential backoff with jitter, so throttled threads don't retry in step
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+# =============== // WRITING BACK // ===============
+
+
+def _write_batch(session, rows: list[dict], places: list[Place | None]) -> tuple[int, int]:
+    found = [(row, place) for row, place in zip(rows, places) if place]
+    if not found:
+        return 0, 0
+
+    # Restaurants that already have one of the places found in this batch
+    owners = {
+        place_id: restaurant_id
+        for place_id, restaurant_id in session.execute(
+            select(DS.Restaurant.google_place_id, DS.Restaurant.id)
+            .where(DS.Restaurant.google_place_id.in_({place.google_place_id for _, place in found}))
+        )
+    }
+
+    updates, merges = [], {}
+    now = DS.utcnow()
+    for row, place in found:
+        owner = owners.setdefault(place.google_place_id, row["id"])
+        if owner != row["id"]:
+            merges[row["id"]] = owner
+            continue
+        values = {
+            "id": row["id"],
+            "google_place_id": place.google_place_id,
+            "latitude": place.latitude,
+            "longitude": place.longitude,
+            "last_updated_at": now,
+        }
+        # Only fill gaps, whatever the user typed in wins
+        for column in ("address", "website", "restaurant_rating"):
+            if row[column] in (None, "") and getattr(place, column) is not None:
+                values[column] = getattr(place, column)
+        updates.append(values)
+
+    if updates:
+        session.execute(update(DS.Restaurant), updates)
+    for duplicate, owner in merges.items():
+        session.execute(
+            update(DS.Rating).where(DS.Rating.restaurant_id == duplicate).values(restaurant_id=owner)
+        )
+    if merges:
+        session.execute(delete(DS.Restaurant).where(DS.Restaurant.id.in_(merges)))
+
+    # Locations and restaurant ids of existing ratings changed, which the
+    # append-only catch-ups can't see
+    bump_data_version(session, REWRITES_VERSION)
+    publish(
+        session,
+        "restaurant",
+        op="update",
+        version=bump_data_version(session, RATINGS_VERSION),
+        count=len(updates) + len(merges)
+    )
+    return len(updates), len(merges)
+
+
+def enrich(
+    cortado,
+    geocoder: Geocoder | None = None,
+    workers: int = 8,
+    per_second: float = 10.0,
+    batch_size: int = 100,
+    checkpoint: str | Path | None = None,
+    limit: int | None = None
+) -> EnrichResult:
+    geocoder = geocoder or geocoder_from_env()
+    limiter = RateLimiter(per_second)
+    state = Checkpoint.load(checkpoint) if checkpoint else None
+    result = state.result if state else EnrichResult()
+
+    with cortado.db.get_session() as session:
+        rows = [dict(row) for row in session.execute(Q.incomplete_restaurants(after_id=result.last_id)).mappings()]
+    if limit is not None:
+        rows = rows[:limit]
+    logger.info("%s restaurants to enrich", len(rows))
+
+    failures = []
+
+    def lookup(row: dict) -> Place | None:
+        # A lookup that keeps failing is logged and left incomplete, a later
+        # run without the checkpoint will try it again
+        try:
+            return lookup_with_retries(geocoder, limiter, row["name"], row["address"])
+        except Exception:
+            logger.exception("Could not look up restaurant %s (%s)", row["id"], row["name"])
+            failures.append(row["id"])
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich") as pool:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            # map() keeps the order, so the batch is written back in id order
+            places = list(pool.map(lookup, batch))
+            with cortado.db.get_session() as session:
+                try:
+                    resolved, merged = _write_batch(session, batch, places)
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    raise
+            result.resolved += resolved
+            result.merged += merged
+            result.failed += len(failures)
+            result.not_found += sum(place is None for place in places) - len(failures)
+            failures.clear()
+            result.last_id = batch[-1]["id"]
+            if state:
+                state.save()
+            logger.info("Enriched %s of %s restaurants", start + len(batch), len(rows))
+    return result
+
+
+if __name__ == "__main__":
+    from cortado import Cortado
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-second", type=float, default=10.0)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--checkpoint", help="resume from (and save progress to) this file")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    print(enrich(
+        Cortado(),
+        workers=args.workers,
+        per_second=args.per_second,
+        batch_size=args.batch_size,
+        checkpoint=args.checkpoint,
+        limit=args.limit
+    ))
@@ -0,0 +1,125 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+import csv
+import io
+from typing import Iterable, Iterator
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+# =============== // CONSTANTS // ===============
+
+BATCH_SIZE = 10_000
+
+# Mirrors the columns of cortado.queries.ratings_join. The Numeric columns
+# come back as floats (asdecimal=False), so they are written as float64
+RATINGS_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("stars", pa.int32()),
+    ("price_zar", pa.float64()),
+    ("notes", pa.string()),
+    ("cookie", pa.bool_()),
+    ("take_away", pa.bool_()),
+    ("num_shots", pa.string()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("restaurant_id", pa.string()),
+    ("restaurant_name", pa.string()),
+    ("address", pa.string()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("restaurant_rating", pa.float64()),
+    ("user_id", pa.string()),
+    ("user_name", pa.string()),
+    ("email", pa.string()),
+])
+
+FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class _Drain(io.RawIOBase):
+    # Write-only sink that hands back whatever was written since the last drain
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        self._position += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_batches(
+    session: Session,
+    stmt: Select,
+    batch_size: int = BATCH_SIZE
+) -> Iterator[list[dict]]:
+    # stream_results asks psycopg2 for a named (server side) cursor, so only
+    # one batch is ever held in memory
+    result = session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+
+def csv_chunks(batches: Iterable[list[dict]], columns: list[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    yield buffer.getvalue().encode()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+
+def parquet_chunks(batches: Iterable[list[dict]], schema: pa.Schema) -> Iterator[bytes]:
+    # Every batch becomes its own row group
+    sink = _Drain()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for batch in batches:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def export_chunks(
+    session: Session,
+    stmt: Select,
+    fmt: str = "csv",
+    batch_size: int = BATCH_SIZE
+) -> Iterator[bytes]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}', expected one of {list(FORMATS)}")
+    batches = stream_batches(session, stmt, batch_size)
+    if fmt == "csv":
+        return csv_chunks(batches, RATINGS_SCHEMA.names)
+    return parquet_chunks(batches, RATINGS_SCHEMA)
@@ -22,6 +22,8 @@ class Restaurant:
     longitude: float | None = field(default=None)
     website: str | None = field(default=None)
     restaurant_rating: float | None = field(default=None)
+    # Set to add the rating to a restaurant we already have, e.g. a suggestion
+    id: str | None = field(default=None)
 
 
 @dataclass
@@ -0,0 +1,160 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+import logging
+
+# =============== // LIBRARY IMPORT // ===============
+
+from sqlalchemy import Engine, Float, String, inspect, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import AddConstraint
+
+# =============== // MODULE IMPORT // ===============
+
+import cortado.datastructures as ds
+
+logger = logging.getLogger(__name__)
+
+# Any constant will do, it just has to be the same for every replica so only
+# one of them runs the migrations at a time.
+MIGRATION_LOCK_ID = 0xC0D7AD0
+
+TIMESTAMP_COLUMNS = ("created_at", "last_updated_at")
+
+# Decodes a 26 character Crockford base32 ULID into the same 16 bytes that
+# ULID.to_uuid() produces. Lives in pg_temp so it disappears with the session.
+ULID_TO_UUID_FUNCTION = """
+CREATE OR REPLACE FUNCTION pg_temp.ulid_to_uuid(ulid text) RETURNS uuid
+LANGUAGE plpgsql IMMUTABLE STRICT AS $$
+DECLARE
+    bits varbit := B'';
+    hex text := '';
+BEGIN
+    FOR i IN 1..26 LOOP
+        bits := bits || (strpos('0123456789ABCDEFGHJKMNPQRSTVWXYZ', upper(substr(ulid, i, 1))) - 1)::bit(5);
+    END LOOP;
+    bits := substring(bits FROM 3);
+    FOR i IN 0..31 LOOP
+        hex := hex || to_hex(substring(bits FROM i * 4 + 1 FOR 4)::bit(4)::int);
+    END LOOP;
+    RETURN hex::uuid;
+END $$
+"""
+
+
+def migrate_epoch_timestamps(connection) -> None:
+    # Older rows stored epoch seconds in Float columns
+    inspector = inspect(connection)
+    for table in ds.Base.metadata.sorted_tables:
+        columns = {c["name"]: c for c in inspector.get_columns(table.name)}
+        for column in TIMESTAMP_COLUMNS:
+            if column in columns and isinstance(columns[column]["type"], Float):
+                logger.info("Converting %s.%s to timestamptz", table.name, column)
+                connection.execute(text(
+                    f'ALTER TABLE "{table.name}" ALTER COLUMN {column} '
+                    f'TYPE TIMESTAMP WITH TIME ZONE USING to_timestamp({column})'
+                ))
+
+
+def migrate_ulid_keys(connection) -> None:
+    # Older rows stored ULIDs as unbounded text keys
+    inspector = inspect(connection)
+    pending = {}
+    for table in ds.Base.metadata.sorted_tables:
+        columns = {c["name"]: c for c in inspector.get_columns(table.name)}
+        pending[table.name] = [
+            column.name for column in table.columns
+            if isinstance(column.type, ds.ULIDKey)
+            and column.name in columns
+            and isinstance(columns[column.name]["type"], String)
+        ]
+    if not any(pending.values()):
+        return
+
+    connection.execute(text(ULID_TO_UUID_FUNCTION))
+
+    # Foreign keys have to go while both sides change type
+    for table in ds.Base.metadata.sorted_tables:
+        for fk in inspector.get_foreign_keys(table.name):
+            connection.execute(text(f'ALTER TABLE "{table.name}" DROP CONSTRAINT "{fk["name"]}"'))
+
+    for table in ds.Base.metadata.sorted_tables:
+        if not pending[table.name]:
+            continue
+        logger.info("Converting %s keys %s to uuid", table.name, pending[table.name])
+        alterations = ", ".join(
+            f"ALTER COLUMN {column} TYPE uuid USING pg_temp.ulid_to_uuid({column})"
+            for column in pending[table.name]
+        )
+        connection.execute(text(f'ALTER TABLE "{table.name}" {alterations}'))
+        # The primary key already indexes id
+        connection.execute(text(f'DROP INDEX IF EXISTS "ix_{table.name}_id"'))
+
+    for table in ds.Base.metadata.sorted_tables:
+        for fk in table.foreign_key_constraints:
+            connection.execute(AddConstraint(fk))
+
+
+def create_missing_indexes(connection) -> None:
+    # create_all() only creates indexes together with new tables
+    inspector = inspect(connection)
+    for table in ds.Base.metadata.sorted_tables:
+        existing = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                logger.info("Creating index %s", index.name)
+                index.create(connection)
+
+
+def has_extension(connection, name: str) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = :name"), {"name": name}
+    ).scalar() is not None
+
+
+def enable_trigram_search(connection) -> None:
+    # Fuzzy restaurant search uses pg_trgm where the server has it. Where it
+    # doesn't (or we may not create extensions), cortado.search falls back to
+    # an in-process index.
+    if not has_extension(connection, "pg_trgm"):
+        available = connection.execute(
+            text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        ).scalar()
+        if not available:
+            return
+        try:
+            with connection.begin_nested():
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except DBAPIError as e:
+            logger.warning("Could not create pg_trgm, using in-process search: %s", e)
+            return
+    for column in ("name", "address"):
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_restaurant_{column}_trgm ON restaurant USING gin ({column} gin_trgm_ops)"
+        ))
+
+
+MIGRATIONS = [
+    migrate_epoch_timestamps,
+    migrate_ulid_keys,
+    create_missing_indexes,
+    enable_trigram_search,
+]
+
+
+def run_migrations(engine: Engine) -> None:
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        for migration in MIGRATIONS:
+            migration(connection)
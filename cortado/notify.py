@@ -0,0 +1,114 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+import json
+import logging
+import select
+import threading
+from typing import Callable
+
+# =============== // LIBRARY IMPORT // ===============
+
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cortado_changes"
+
+
+def publish(session: Session, table: str, op: str = "insert", **payload) -> None:
+    # pg_notify is transactional: listeners only hear about it once the
+    # surrounding transaction commits, and never if it rolls back
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": json.dumps({"table": table, "op": op, **payload}, default=str)}
+    )
+
+
+class ChangeListener(threading.Thread):
+    # Holds one dedicated connection per process that LISTENs for changes and
+    # fans them out to the subscribed callbacks
+
+    def __init__(
+        self,
+        engine: Engine,
+        channel: str = CHANNEL,
+        poll_interval: float = 5.0,
+        reconnect_delay: float = 5.0
+    ):
+        super().__init__(name=f"listen-{channel}", daemon=True)
+        self._engine = engine
+        self._channel = channel
+        self._poll_interval = poll_interval
+        self._reconnect_delay = reconnect_delay
+        self._callbacks: list[Callable[[dict], None]] = []
+        self._stopped = threading.Event()
+        self._listened_before = False
+        self.version = 0
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        self._callbacks.append(callback)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _dispatch(self, change: dict) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(change)
+            except Exception:
+                logger.exception("Change callback failed for %s", change)
+        # Only now, so whoever polls version reruns against cleared caches
+        self.version += 1
+
+    def _listen(self) -> None:
+        raw = self._engine.raw_connection()
+        connection = raw.driver_connection
+        # Keep this connection out of the pool, it is ours for good
+        raw.detach()
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self._channel}"')
+
+            # Anything may have changed while we were not listening
+            if self._listened_before:
+                self._dispatch({"table": "*", "op": "reconnect"})
+            self._listened_before = True
+
+            while not self._stopped.is_set():
+                readable, _, _ = select.select([connection], [], [], self._poll_interval)
+                if not readable:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notification = connection.notifies.pop(0)
+                    try:
+                        change = json.loads(notification.payload)
+                    except ValueError:
+                        change = {"table": "*", "op": notification.payload}
+                    self._dispatch(change)
+        finally:
+            connection.close()
+
+    def run(self) -> None:
+        if self._engine.dialect.name != "postgresql":
+            return
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Lost the %s listener connection, reconnecting", self._channel)
+                self._stopped.wait(self._reconnect_delay)
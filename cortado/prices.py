@@ -0,0 +1,147 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Price analytics over plain float64 / integer cent arrays.
+#
+# Everything here is vectorised and returns small pre-aggregated frames, so
+# charts built on them stay the same size no matter how many ratings there
+# are. Missing prices are NaN and are left out of every figure.
+
+# =============== // LIBRARY IMPORT // ===============
+
+import numpy as np
+import pandas as pd
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+SHOTS = {
+    "single": 1,
+    "double": 2,
+    "triple": 3,
+}
+
+
+def as_prices(values) -> np.ndarray:
+    # Floats, with anything missing or negative as NaN. A free coffee (0) is
+    # kept so averages agree with queries.statistics().
+    prices = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(prices >= 0, prices, np.nan)
+
+
+def to_cents(prices: np.ndarray) -> np.ndarray:
+    # Exact integer cents for sums, missing prices count as 0
+    return np.where(np.isnan(prices), 0, np.rint(prices * 100)).astype(np.int64)
+
+
+def total_spent(prices: np.ndarray) -> float:
+    return to_cents(prices).sum() / 100
+
+
+def percentiles(prices: np.ndarray, q=PERCENTILES) -> dict[int, float]:
+    if np.isnan(prices).all():
+        return {p: np.nan for p in q}
+    return dict(zip(q, np.nanpercentile(prices, q).tolist()))
+
+
+def shot_counts(num_shots) -> np.ndarray:
+    # Unknown shot sizes are NaN rather than guessed
+    return pd.Series(num_shots).map(SHOTS).to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def price_per_shot(prices: np.ndarray, num_shots) -> np.ndarray:
+    return prices / shot_counts(num_shots)
+
+
+def value_score(stars, prices: np.ndarray) -> np.ndarray:
+    # Stars per rand, so a 4 star R20 cortado beats a 5 star R40 one. Free
+    # ones have no meaningful value score.
+    stars = np.asarray(stars, dtype=np.float64)
+    return np.divide(stars, prices, out=np.full_like(stars, np.nan), where=prices > 0)
+
+
+def histogram(prices: np.ndarray, bins: int = 40) -> pd.DataFrame:
+    prices = prices[~np.isnan(prices)]
+    if not len(prices):
+        return pd.DataFrame(columns=["price", "width", "ratings"])
+    counts, edges = np.histogram(prices, bins=bins)
+    return pd.DataFrame({"price": (edges[:-1] + edges[1:]) / 2, "width": np.diff(edges), "ratings": counts})
+
+
+def frame(df: pd.DataFrame) -> pd.DataFrame:
+    # The ratings columns the aggregates below need, with the derived numbers
+    # worked out once. Build it once per dataset and pass it to each of them.
+    prices = as_prices(df["price_zar"])
+    out = df[["restaurant_id", "restaurant_name", "num_shots"]].reset_index(drop=True)
+    out["created_at"] = pd.to_datetime(df["created_at"], utc=True).dt.tz_localize(None).to_numpy()
+    out["stars"] = df["stars"].to_numpy(dtype=np.float64)
+    out["price"] = prices
+    out["price_per_shot"] = price_per_shot(prices, out["num_shots"])
+    out["value"] = value_score(out["stars"], prices)
+    return out
+
+
+def restaurant_prices(priced: pd.DataFrame, min_ratings: int = 1) -> pd.DataFrame:
+    # One row per restaurant, the shape most price charts want
+    priced = priced.dropna(subset=["price"])
+    summary = priced.groupby("restaurant_id", sort=False).agg(
+        restaurant_name=("restaurant_name", "first"),
+        ratings=("price", "size"),
+        average_rating=("stars", "mean"),
+        median_price=("price", "median"),
+        value=("value", "mean"),
+    )
+    return summary[summary["ratings"] >= min_ratings].reset_index()
+
+
+def shot_prices(priced: pd.DataFrame) -> pd.DataFrame:
+    # Price per shot spread for every known shot size
+    priced = priced.dropna(subset=["price_per_shot"])
+    if priced.empty:
+        # num_shots is optional, a period may have no known shot sizes at all
+        return pd.DataFrame(columns=["num_shots", "p25", "median", "p75", "ratings"])
+    grouped = priced.groupby("num_shots")["price_per_shot"]
+    summary = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    summary.columns = ["p25", "median", "p75"]
+    summary["ratings"] = grouped.size()
+    return summary.reset_index()
+
+
+def price_drift(priced: pd.DataFrame, top: int = 8, freq: str = "M") -> pd.DataFrame:
+    # Median price per period for the most rated restaurants, with the change
+    # against each one's first period
+    priced = priced.dropna(subset=["price"])
+    busiest = priced["restaurant_id"].value_counts().index[:top]
+    priced = priced[priced["restaurant_id"].isin(busiest)].copy()
+    priced["period"] = priced["created_at"].dt.to_period(freq).dt.start_time
+    drift = priced.groupby(["restaurant_id", "period"], sort=True).agg(
+        restaurant_name=("restaurant_name", "first"),
+        median_price=("price", "median"),
+        ratings=("price", "size"),
+    ).reset_index()
+    first = drift.groupby("restaurant_id")["median_price"].transform("first")
+    drift["drift_pct"] = (drift["median_price"] / first - 1) * 100
+    return drift
+
+
+def price_star_bins(priced: pd.DataFrame, bins: int = 60, clip: float = 99.5) -> pd.DataFrame:
+    # Ratings counted per price bin and star, at most bins * 5 rows however
+    # many ratings there are. Prices past the clip percentile share the top
+    # bin so one R300 typo doesn't squash everything else into a corner.
+    priced = priced.dropna(subset=["price"])
+    if priced.empty:
+        return pd.DataFrame(columns=["price", "stars", "ratings"])
+    price = priced["price"].to_numpy()
+    low, high = price.min(), np.percentile(price, clip)
+    edges = np.linspace(low, max(high, low + 1), bins + 1)
+    position = np.clip(np.searchsorted(edges, price, side="right") - 1, 0, bins - 1)
+    counts = pd.DataFrame({"bin": position, "stars": priced["stars"].to_numpy()}).value_counts()
+    counts = counts.rename("ratings").reset_index()
+    counts["price"] = (edges[counts["bin"]] + edges[counts["bin"] + 1]) / 2
+    return counts[["price", "stars", "ratings"]].sort_values(["stars", "price"], ignore_index=True)
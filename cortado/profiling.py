@@ -0,0 +1,161 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# cProfile one run of something and boil it down for the dashboard.
+#
+# The report has a hot-function table and a caller tree for an icicle chart.
+# cProfile only keeps caller -> callee totals, not whole stacks, so the tree
+# splits a function's time between the places it was called from in
+# proportion (like gprof does). The raw profile is saved as well, for
+# snakeviz or `python -m pstats`.
+
+# =============== // STANDARD IMPORT // ===============
+
+import cProfile
+import os
+import pstats
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pandas as pd
+
+# Leave out branches smaller than this share of the run
+MIN_SHARE = 0.005
+MAX_DEPTH = 12
+HOT_FUNCTIONS = 40
+
+# Profiles kept on disk, oldest go first
+KEEP_PROFILES = int(os.getenv("CORTADO_PROFILE_KEEP", 20))
+
+
+def enabled(query_params) -> bool:
+    # ?profile=1 for one session, CORTADO_PROFILE=1 for every run
+    return os.getenv("CORTADO_PROFILE") == "1" or query_params.get("profile") == "1"
+
+
+def default_directory() -> Path:
+    return Path(os.getenv("CORTADO_PROFILE_DIR", Path(tempfile.gettempdir()) / "cortado-profiles"))
+
+
+@dataclass
+class ProfileReport:
+    path: Path
+    seconds: float
+    functions: pd.DataFrame
+    tree: pd.DataFrame
+
+
+def _label(func: tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        # Built-ins come as ('~', 0, "<built-in method ...>")
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def hot_functions(stats: dict, limit: int = HOT_FUNCTIONS) -> pd.DataFrame:
+    functions = pd.DataFrame([
+        {
+            "function": _label(func),
+            "calls": calls,
+            "own_s": own,
+            "cumulative_s": cumulative,
+            "per_call_ms": cumulative / calls * 1000 if calls else 0.0,
+            "file": func[0],
+        }
+        for func, (_, calls, own, cumulative, _) in stats.items()
+    ])
+    return functions.sort_values("own_s", ascending=False).head(limit).reset_index(drop=True)
+
+
+def call_tree(stats: dict, min_share: float = MIN_SHARE, max_depth: int = MAX_DEPTH) -> pd.DataFrame:
+    # ids, parents and seconds in the shape px.icicle(branchvalues="total") wants
+    callees = defaultdict(dict)
+    for func, (*_, callers) in stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees[caller][func] = cumulative
+    roots = [func for func, (*_, callers) in stats.items() if not callers]
+    total = sum(stats[root][3] for root in roots)
+    rows = []
+
+    def walk(func, seconds, parent, depth, path):
+        node = f"{parent}/{_label(func)}"
+        rows.append({"id": node, "parent": parent, "function": _label(func), "seconds": seconds})
+        if depth == max_depth or not stats[func][3]:
+            return
+        # This node is only part of all the time spent in func
+        share = seconds / stats[func][3]
+        children = {
+            callee: cumulative * share
+            for callee, cumulative in callees[func].items()
+            if callee not in path and cumulative * share >= min_share * total
+        }
+        # Recursion and rounding can leave children worth more than their parent
+        scale = min(1.0, seconds / sum(children.values())) if children else 1.0
+        for callee, child_seconds in sorted(children.items(), key=lambda c: -c[1]):
+            walk(callee, child_seconds * scale, node, depth + 1, path | {callee})
+
+    for root in sorted(roots, key=lambda r: -stats[r][3]):
+        if stats[root][3] >= min_share * total:
+            walk(root, stats[root][3], "", 0, {root})
+    return pd.DataFrame(rows, columns=["id", "parent", "function", "seconds"])
+
+
+class Profiler:
+    # with Profiler() as profiler: ...   then profiler.report
+
+    def __init__(self, directory: str | Path | None = None, name: str = "run", keep: int = KEEP_PROFILES):
+        self.directory = Path(directory) if directory else default_directory()
+        self.name = name
+        self.keep = keep
+        self.report: ProfileReport | None = None
+        self._profile = cProfile.Profile()
+
+    def __enter__(self) -> "Profiler":
+        self._start = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        # Also runs when the profiled code raises, e.g. st.stop()
+        self._profile.disable()
+        seconds = time.perf_counter() - self._start
+        stats = pstats.Stats(self._profile)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Milliseconds too, a busy session can finish several runs a second
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() // 1_000_000 % 1000:03d}"
+        path = self.directory / f"{self.name}-{stamp}-{os.getpid()}.prof"
+        stats.dump_stats(path)
+        self._prune()
+        self.report = ProfileReport(
+            path=path,
+            seconds=seconds,
+            functions=hot_functions(stats.stats),
+            tree=call_tree(stats.stats)
+        )
+        return False
+
+    def _prune(self) -> None:
+        # With CORTADO_PROFILE=1 every run writes one, so only keep the latest
+        profiles = []
+        for path in self.directory.glob(f"{self.name}-*.prof"):
+            try:
+                profiles.append((path.stat().st_mtime_ns, path))
+            except FileNotFoundError:
+                # Another process pruned it first
+                continue
+        profiles.sort()
+        for _, path in profiles[:max(len(profiles) - self.keep, 0)]:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,290 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+from datetime import datetime, timedelta
+
+# =============== // LIBRARY IMPORT // ===============
+
+from sqlalchemy import Integer, Select, func, literal, or_, select
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado.datastructures import Rating, Restaurant, User, utcnow, ulid_floor
+from cortado.search import ADDRESS_WEIGHT
+
+# =============== // PERIODS // ===============
+
+PERIODS: dict[str, int | None] = {
+    "All time": None,
+    "Last 7 days": 7,
+    "Last 30 days": 30,
+    "Last 365 days": 365,
+}
+
+
+def since_days(days: int | None) -> datetime | None:
+    if days is None:
+        return None
+    return utcnow() - timedelta(days=days)
+
+
+# =============== // QUERIES // ===============
+
+
+def ratings_join(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_id: str | None = None,
+    restaurant_id: str | None = None,
+    user_id: str | None = None,
+    restaurants: list[str] | None = None,
+    num_shots: list[str | None] | None = None,
+    min_stars: int | None = None,
+    cookie_only: bool = False,
+    take_away_only: bool = False
+) -> Select:
+    stmt = select(
+        Rating.id,
+        Rating.stars,
+        Rating.price_zar,
+        Rating.notes,
+        Rating.cookie,
+        Rating.take_away,
+        Rating.num_shots,
+        Rating.created_at,
+        Rating.restaurant_id,
+        Restaurant.name.label('restaurant_name'),
+        Restaurant.address,
+        Restaurant.latitude,
+        Restaurant.longitude,
+        Restaurant.restaurant_rating,
+        Rating.user_id,
+        User.name.label('user_name'),
+        User.email
+    ).join(Restaurant).join(User)
+
+    if since is not None:
+        stmt = stmt.where(Rating.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Rating.created_at < until)
+    if restaurant_id is not None:
+        stmt = stmt.where(Rating.restaurant_id == restaurant_id)
+    if user_id is not None:
+        stmt = stmt.where(Rating.user_id == user_id)
+    if restaurants:
+        stmt = stmt.where(Restaurant.name.in_(restaurants))
+    if num_shots:
+        shots = [n for n in num_shots if n is not None]
+        if None in num_shots:
+            stmt = stmt.where(or_(Rating.num_shots.in_(shots), Rating.num_shots.is_(None)))
+        else:
+            stmt = stmt.where(Rating.num_shots.in_(shots))
+    if min_stars is not None:
+        stmt = stmt.where(Rating.stars >= min_stars)
+    if cookie_only:
+        stmt = stmt.where(Rating.cookie.is_(True))
+    if take_away_only:
+        stmt = stmt.where(Rating.take_away.is_(True))
+    if after_id is not None:
+        # ULID keys are time ordered, so this is a primary key range scan
+        stmt = stmt.where(Rating.id > after_id).order_by(Rating.id)
+    return stmt
+
+
+def rating_matrix(after_id: str | None = None) -> Select:
+    # Just what cortado.recommend needs, in rating order
+    stmt = select(
+        Rating.id,
+        Rating.user_id,
+        User.name.label('user_name'),
+        Rating.restaurant_id,
+        Restaurant.name.label('restaurant_name'),
+        Restaurant.latitude,
+        Restaurant.longitude,
+        Rating.stars
+    ).join(Restaurant).join(User).order_by(Rating.id)
+    if after_id is not None:
+        stmt = stmt.where(Rating.id > after_id)
+    return stmt
+
+
+def ratings_since_key(ts: datetime) -> Select:
+    return ratings_join(after_id=ulid_floor(ts))
+
+
+def statistics(since: datetime | None = None) -> Select:
+    # Same figures as the dashboard's quick stats, aggregated in the database
+    stmt = select(
+        func.count(Rating.id).label('total_ratings'),
+        func.coalesce(func.avg(Rating.stars), 0).label('average_rating'),
+        func.coalesce(func.sum(Rating.cookie.cast(Integer)), 0).label('total_cookies'),
+        func.coalesce(func.sum(Rating.take_away.cast(Integer)), 0).label('total_take_always'),
+        func.count(Rating.restaurant_id.distinct()).label('unique_restaurants'),
+        func.count(Rating.user_id.distinct()).label('unique_users'),
+        func.coalesce(func.avg(Rating.price_zar), 0).label('average_price'),
+        func.coalesce(func.sum(Rating.price_zar), 0).label('total_spent')
+    )
+    if since is not None:
+        stmt = stmt.where(Rating.created_at >= since)
+    return stmt
+
+
+def restaurant_summary(restaurant_id: str) -> Select:
+    return select(
+        Restaurant.id,
+        Restaurant.name,
+        Restaurant.address,
+        Restaurant.latitude,
+        Restaurant.longitude,
+        Restaurant.website,
+        Restaurant.restaurant_rating,
+        func.count(Rating.id).label('total_ratings'),
+        func.avg(Rating.stars).label('average_rating'),
+        func.avg(Rating.price_zar).label('average_price'),
+        func.min(Rating.price_zar).label('min_price'),
+        func.max(Rating.price_zar).label('max_price'),
+        func.min(Rating.created_at).label('first_rated_at'),
+        func.max(Rating.created_at).label('last_rated_at')
+    ).outerjoin(Rating).where(Restaurant.id == restaurant_id).group_by(Restaurant.id)
+
+
+def user_summary(user_id: str) -> Select:
+    return select(
+        User.id,
+        User.name,
+        User.email,
+        func.count(Rating.id).label('total_ratings'),
+        func.count(Rating.restaurant_id.distinct()).label('unique_restaurants'),
+        func.avg(Rating.stars).label('average_rating'),
+        func.avg(Rating.price_zar).label('average_price'),
+        func.min(Rating.price_zar).label('min_price'),
+        func.max(Rating.price_zar).label('max_price'),
+        func.coalesce(func.sum(Rating.price_zar), 0).label('total_spent'),
+        func.min(Rating.created_at).label('first_rated_at'),
+        func.max(Rating.created_at).label('last_rated_at')
+    ).outerjoin(Rating).where(User.id == user_id).group_by(User.id)
+
+
+# =============== // DRILL-DOWN // ===============
+# Everything below filters on one restaurant or user first, so Postgres reads
+# only that entity's rows through ix_rating_restaurant_id_created_at or
+# ix_rating_user_id_created_at.
+
+
+def _entity(restaurant_id: str | None, user_id: str | None):
+    if (restaurant_id is None) == (user_id is None):
+        raise ValueError("Pass exactly one of restaurant_id or user_id")
+    if restaurant_id is not None:
+        return Rating.restaurant_id == restaurant_id
+    return Rating.user_id == user_id
+
+
+def rating_trend(
+    restaurant_id: str | None = None,
+    user_id: str | None = None,
+    period: str = "month"
+) -> Select:
+    bucket = func.date_trunc(period, Rating.created_at).label('period')
+    return select(
+        bucket,
+        func.count(Rating.id).label('ratings'),
+        func.avg(Rating.stars).label('average_rating'),
+        func.avg(Rating.price_zar).label('average_price'),
+        func.min(Rating.price_zar).label('min_price'),
+        func.max(Rating.price_zar).label('max_price')
+    ).where(_entity(restaurant_id, user_id)).group_by(bucket).order_by(bucket)
+
+
+def shot_mix(restaurant_id: str | None = None, user_id: str | None = None) -> Select:
+    return select(
+        Rating.num_shots,
+        func.count(Rating.id).label('ratings'),
+        func.avg(Rating.stars).label('average_rating'),
+        func.avg(Rating.price_zar).label('average_price')
+    ).where(_entity(restaurant_id, user_id)).group_by(Rating.num_shots).order_by(Rating.num_shots)
+
+
+def restaurant_options(after_id: str | None = None) -> Select:
+    stmt = select(Restaurant.id, Restaurant.name, Restaurant.address).order_by(Restaurant.name)
+    if after_id:
+        stmt = stmt.where(Restaurant.id > after_id)
+    return stmt
+
+
+def user_options() -> Select:
+    return select(User.id, User.name).order_by(User.name)
+
+
+def restaurant_by_place_id(google_place_id: str) -> Select:
+    return select(Restaurant).where(Restaurant.google_place_id == google_place_id).limit(1)
+
+
+def manual_restaurant_by_name(name: str) -> Select:
+    # Typed in by hand: the same name again is the same place
+    return select(Restaurant).where(
+        Restaurant.google_place_id.is_(None),
+        func.lower(Restaurant.name) == name.strip().lower()
+    ).limit(1)
+
+
+def user_by_name(name: str) -> Select:
+    return select(User).where(User.name == name).limit(1)
+
+
+def incomplete_restaurants(after_id: str | None = None) -> Select:
+    # Manually entered restaurants, which have no place id or no location
+    stmt = select(
+        Restaurant.id,
+        Restaurant.name,
+        Restaurant.address,
+        Restaurant.website,
+        Restaurant.restaurant_rating
+    ).where(or_(
+        Restaurant.google_place_id.is_(None),
+        Restaurant.latitude.is_(None),
+        Restaurant.longitude.is_(None),
+    ))
+    if after_id:
+        stmt = stmt.where(Restaurant.id > after_id)
+    return stmt.order_by(Restaurant.id)
+
+
+# =============== // PG_TRGM // ===============
+# Only for databases with the pg_trgm extension, see cortado.search
+
+
+def suggest_restaurants(query: str, limit: int = 10) -> Select:
+    # `<%` keeps rows whose word_similarity() passes pg_trgm's threshold,
+    # which the GIN indexes on name and address can answer. Address matches
+    # count for less, like in RestaurantIndex.suggest().
+    score = func.greatest(
+        func.word_similarity(query, Restaurant.name),
+        ADDRESS_WEIGHT * func.word_similarity(query, func.coalesce(Restaurant.address, ""))
+    )
+    return select(
+        Restaurant.id,
+        Restaurant.name,
+        Restaurant.address,
+        score.label("score")
+    ).where(or_(
+        literal(query).op("<%")(Restaurant.name),
+        literal(query).op("<%")(Restaurant.address),
+    )).order_by(score.desc(), func.length(Restaurant.name)).limit(limit)
+
+
+def similar_restaurants(name: str) -> Select:
+    # Candidates only, cortado.search.duplicate_score() has the final say
+    return select(Restaurant.id, Restaurant.name, Restaurant.address).where(or_(
+        Restaurant.name.op("%")(name),
+        Restaurant.name.op("%>")(name),
+        Restaurant.name.op("<%")(name),
+    ))
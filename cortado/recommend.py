@@ -0,0 +1,317 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Item-item collaborative filtering over the user x restaurant star matrix.
+#
+# A user's opinion of a restaurant is their latest rating less their own
+# average, so a harsh rater's 3 stars still counts as praise. Restaurants are
+# compared with cosine similarity over those opinions (adjusted cosine) and
+# only the top NEIGHBOURS of each are kept, as two dense (restaurants x
+# NEIGHBOURS) arrays. Scoring a user is then a gather over the restaurants
+# they rated plus one bincount.
+
+# =============== // STANDARD IMPORT // ===============
+
+import threading
+import warnings
+
+# =============== // LIBRARY IMPORT // ===============
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from ulid import ULID
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado.datastructures import ulid_floor
+from cortado.snapshot import CATCH_UP_OVERLAP
+
+NEIGHBOURS = 50
+MIDPOINT = 3.0
+EARTH_RADIUS_KM = 6371.0
+
+# Restaurants compared per block while building, bounds the scratch space
+BLOCK_SIZE = 1024
+
+# Popularity is a Bayesian average that starts every restaurant on this many
+# ratings at the global mean, so one 5 star doesn't top the list. User
+# averages start on the middle of the scale the same way.
+PRIOR_RATINGS = 5
+
+# Added to the similarity mass behind a score, so a restaurant backed by one
+# weak neighbour can't outrank one backed by many strong ones
+SHRINKAGE = 1.0
+
+
+def haversine_km(lat: np.ndarray, lon: np.ndarray, near: tuple[float, float]) -> np.ndarray:
+    lat1, lon1 = np.radians(near)
+    lat2, lon2 = np.radians(lat), np.radians(lon)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def top_neighbours(
+    similarities: sparse.csr_matrix,
+    n: int,
+    offset: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    # Row-wise top n of a sparse block of similarities whose first row is
+    # restaurant `offset`. Rows with fewer than n positive entries are padded
+    # with weight 0, which never contributes to a score.
+    rows = np.repeat(np.arange(similarities.shape[0]), np.diff(similarities.indptr))
+    data = np.where(similarities.indices == rows + offset, 0, similarities.data)
+    order = np.lexsort((-data, rows))
+    rows, rank = rows[order], np.arange(len(order)) - similarities.indptr[rows[order]]
+    keep = (rank < n) & (data[order] > 0)
+
+    index = np.zeros((similarities.shape[0], n), dtype=np.int32)
+    weight = np.zeros((similarities.shape[0], n), dtype=np.float32)
+    index[rows[keep], rank[keep]] = similarities.indices[order][keep]
+    weight[rows[keep], rank[keep]] = data[order][keep]
+    return index, weight
+
+
+class Recommender:
+    def __init__(self, neighbours: int = NEIGHBOURS):
+        self.neighbours = neighbours
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.updates = 0
+        self.last_id = None
+        # Ids folded in within CATCH_UP_OVERLAP of last_id, the next update
+        # reads them again
+        self.recent_ids: set[str] = set()
+
+        self.user_index: dict[str, int] = {}
+        self.user_by_name: dict[str, str] = {}
+        self.restaurant_index: dict[str, int] = {}
+        self.restaurant_ids: list[str] = []
+        self.restaurant_names: list[str] = []
+        self.latitude = np.empty(0)
+        self.longitude = np.empty(0)
+        self.star_sum = np.empty(0)
+        self.star_count = np.empty(0)
+
+        # Raw latest stars and the same entries less each user's average
+        self.stars = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.user_mean = np.empty(0, dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+        self.neighbour_index = np.empty((0, self.neighbours), dtype=np.int32)
+        self.neighbour_weight = np.empty((0, self.neighbours), dtype=np.float32)
+
+    # =============== // BUILD // ===============
+
+    def _grow(self, new: pd.DataFrame) -> None:
+        grow = len(new)
+        self.latitude = np.concatenate([self.latitude, pd.to_numeric(new["latitude"]).to_numpy(float, na_value=np.nan)])
+        self.longitude = np.concatenate([self.longitude, pd.to_numeric(new["longitude"]).to_numpy(float, na_value=np.nan)])
+        self.star_sum = np.concatenate([self.star_sum, np.zeros(grow)])
+        self.star_count = np.concatenate([self.star_count, np.zeros(grow)])
+        self.norms = np.concatenate([self.norms, np.zeros(grow, dtype=np.float32)])
+        self.neighbour_index = np.vstack([self.neighbour_index, np.zeros((grow, self.neighbours), dtype=np.int32)])
+        self.neighbour_weight = np.vstack([self.neighbour_weight, np.zeros((grow, self.neighbours), dtype=np.float32)])
+
+    def _register(self, ratings: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        # Map ids to matrix positions, growing every per-restaurant array
+        for user_id, user_name in zip(ratings["user_id"], ratings["user_name"]):
+            if user_id not in self.user_index:
+                self.user_index[user_id] = len(self.user_index)
+            self.user_by_name[user_name] = user_id
+        grow = len(self.user_index) - len(self.user_mean)
+        self.user_mean = np.concatenate([self.user_mean, np.full(grow, MIDPOINT, dtype=np.float32)])
+
+        restaurants = ratings.drop_duplicates("restaurant_id", keep="last")
+        new = restaurants[[r not in self.restaurant_index for r in restaurants["restaurant_id"]]]
+        for restaurant_id in new["restaurant_id"]:
+            self.restaurant_index[restaurant_id] = len(self.restaurant_ids)
+            self.restaurant_ids.append(restaurant_id)
+        self.restaurant_names += new["restaurant_name"].tolist()
+        if len(new):
+            self._grow(new)
+        self.stars.resize((len(self.user_index), len(self.restaurant_ids)))
+        self.matrix.resize((len(self.user_index), len(self.restaurant_ids)))
+
+        users = np.array([self.user_index[u] for u in ratings["user_id"]], dtype=np.int32)
+        items = np.array([self.restaurant_index[r] for r in ratings["restaurant_id"]], dtype=np.int32)
+        stars = ratings["stars"].to_numpy(float)
+        np.add.at(self.star_sum, items, stars)
+        np.add.at(self.star_count, items, 1)
+        return users, items
+
+    def fit(self, ratings: pd.DataFrame) -> "Recommender":
+        # Expects rows in rating order, see cortado.queries.rating_matrix
+        with self.lock:
+            self._reset()
+            if ratings.empty:
+                return self
+            users, items = self._register(ratings)
+
+            # Latest rating wins when someone rated a place more than once
+            latest = pd.DataFrame({"u": users, "i": items}).drop_duplicates(keep="last").index
+            self.stars = sparse.csr_matrix(
+                (ratings["stars"].to_numpy(np.float32)[latest], (users[latest], items[latest])),
+                shape=(len(self.user_index), len(self.restaurant_ids)),
+                dtype=np.float32
+            )
+            counts = np.diff(self.stars.indptr)
+            sums = np.asarray(self.stars.sum(axis=1)).ravel()
+            self.user_mean = ((sums + PRIOR_RATINGS * MIDPOINT) / (counts + PRIOR_RATINGS)).astype(np.float32)
+            self.matrix = self.stars.copy()
+            self.matrix.data -= np.repeat(self.user_mean, counts)
+            self.norms = np.sqrt(np.asarray(self.matrix.multiply(self.matrix).sum(axis=0)).ravel()).astype(np.float32)
+
+            scale = sparse.diags(np.divide(1, self.norms, out=np.zeros_like(self.norms), where=self.norms > 0))
+            normalised = (self.matrix @ scale).tocsc()
+            transposed = normalised.T.tocsr()
+            for start in range(0, len(self.restaurant_ids), BLOCK_SIZE):
+                stop = min(start + BLOCK_SIZE, len(self.restaurant_ids))
+                block = (transposed[start:stop] @ normalised).tocsr()
+                index, weight = top_neighbours(block, self.neighbours, offset=start)
+                self.neighbour_index[start:stop] = index
+                self.neighbour_weight[start:stop] = weight
+
+            self.last_id = ratings["id"].iloc[-1]
+            self._remember(ratings["id"])
+            return self
+
+    # =============== // INCREMENTAL UPDATES // ===============
+
+    def catch_up_id(self) -> str | None:
+        # ULIDs are minted before commit, so an older id can land after
+        # last_id. Updates re-read a little way back and skip what they've seen.
+        if self.last_id is None:
+            return None
+        return ulid_floor(ULID.from_str(self.last_id).datetime - CATCH_UP_OVERLAP)
+
+    def _remember(self, ids: pd.Series) -> None:
+        floor = self.catch_up_id()
+        self.recent_ids = {i for i in self.recent_ids if i >= floor}
+        self.recent_ids.update(ids[ids >= floor])
+
+    def _refresh_neighbours(self, item: int) -> None:
+        # Everyone who rated the restaurant, and how much they liked it
+        entries = np.flatnonzero(self.matrix.indices == item)
+        raters = np.searchsorted(self.matrix.indptr, entries, side="right") - 1
+        self.norms[item] = np.linalg.norm(self.matrix.data[entries])
+        opinion = sparse.csr_matrix(self.matrix.data[entries][None, :])
+        dots = (opinion @ self.matrix[raters]).tocsr()
+        denominator = self.norms[item] * self.norms[dots.indices]
+        dots.data = np.divide(dots.data, denominator, out=np.zeros_like(dots.data), where=denominator > 0)
+        index, weight = top_neighbours(dots, self.neighbours, offset=item)
+        self.neighbour_index[item] = index[0]
+        self.neighbour_weight[item] = weight[0]
+
+        # Let the new neighbours point back, replacing their weakest link
+        for other, similarity in zip(index[0], weight[0]):
+            if similarity <= 0:
+                continue
+            slots = self.neighbour_index[other] == item
+            if slots.any():
+                self.neighbour_weight[other, slots] = similarity
+            else:
+                weakest = self.neighbour_weight[other].argmin()
+                if similarity > self.neighbour_weight[other, weakest]:
+                    self.neighbour_index[other, weakest] = item
+                    self.neighbour_weight[other, weakest] = similarity
+
+    def update(self, ratings: pd.DataFrame) -> None:
+        # Folds in ratings written since the last fit or update. Only the
+        # rated restaurants' neighbourhoods are recomputed, although the
+        # raters' averages shift a little for everything they rated; a
+        # periodic fit() cleans that up.
+        with self.lock:
+            ratings = ratings[~ratings["id"].isin(self.recent_ids)]
+            if ratings.empty:
+                return
+            users, items = self._register(ratings)
+            with warnings.catch_warnings():
+                # Adding entries to a CSR matrix is fine at rating-write rates
+                warnings.simplefilter("ignore", sparse.SparseEfficiencyWarning)
+                for user, item, stars in zip(users, items, ratings["stars"].to_numpy(float)):
+                    # Same insert on both keeps their sparsity patterns identical
+                    self.stars[user, item] = stars
+                    self.matrix[user, item] = stars
+            for user in np.unique(users):
+                start, stop = self.stars.indptr[user], self.stars.indptr[user + 1]
+                row = self.stars.data[start:stop]
+                self.user_mean[user] = (row.sum() + PRIOR_RATINGS * MIDPOINT) / (len(row) + PRIOR_RATINGS)
+                self.matrix.data[start:stop] = row - self.user_mean[user]
+            for item in np.unique(items):
+                self._refresh_neighbours(item)
+            self.updates += len(ratings)
+            self.last_id = max(self.last_id or "", ratings["id"].max())
+            self._remember(ratings["id"])
+
+    # =============== // RECOMMEND // ===============
+
+    def popularity(self) -> np.ndarray:
+        total = self.star_count.sum()
+        mean = self.star_sum.sum() / total if total else MIDPOINT
+        return (self.star_sum + PRIOR_RATINGS * mean) / (self.star_count + PRIOR_RATINGS)
+
+    def recommend(
+        self,
+        user: str | None,
+        k: int = 10,
+        near: tuple[float, float] | None = None,
+        radius_km: float = 10.0
+    ) -> list[dict]:
+        # Restaurants the user hasn't rated, best collaborative score first with
+        # popularity settling near-ties. Unknown users get the popular places.
+        with self.lock:
+            n = len(self.restaurant_ids)
+            if not n:
+                return []
+            scores = np.zeros(n)
+            rated = np.empty(0, dtype=np.int32)
+            row = self.user_index.get(user)
+            if row is not None:
+                start, stop = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+                rated = self.matrix.indices[start:stop]
+                opinion = self.matrix.data[start:stop]
+                index = self.neighbour_index[rated]
+                weight = self.neighbour_weight[rated]
+                scores = np.bincount(index.ravel(), (weight * opinion[:, None]).ravel(), minlength=n)
+                scores /= np.bincount(index.ravel(), weight.ravel(), minlength=n) + SHRINKAGE
+
+            candidates = np.ones(n, dtype=bool)
+            candidates[rated] = False
+            if near is not None:
+                # Cheap bounding box first, exact distance only for what's in it
+                lat_span = np.degrees(radius_km / EARTH_RADIUS_KM)
+                lon_span = lat_span / max(np.cos(np.radians(near[0])), 1e-6)
+                candidates &= np.abs(self.latitude - near[0]) <= lat_span
+                candidates &= np.abs(self.longitude - near[1]) <= lon_span
+            candidates = np.flatnonzero(candidates)
+            distance = np.full(n, np.nan)
+            if near is not None:
+                distance[candidates] = haversine_km(self.latitude[candidates], self.longitude[candidates], near)
+                candidates = candidates[distance[candidates] <= radius_km]
+
+            # Scores are shrunk mean opinions within [-4, 4] and popularity
+            # sits in [1, 5], so it only reorders scores within a few hundredths
+            popularity = self.popularity()
+            rank = scores[candidates] + popularity[candidates] / 100
+            top = np.argpartition(-rank, min(k, len(rank)) - 1)[:k] if len(rank) > k else np.arange(len(rank))
+            order = top[np.argsort(-rank[top])]
+            return [
+                {
+                    "restaurant_id": self.restaurant_ids[i],
+                    "restaurant_name": self.restaurant_names[i],
+                    "score": float(scores[i]),
+                    "popularity": float(popularity[i]),
+                    "distance_km": float(distance[i]) if near is not None else None,
+                }
+                for i in candidates[order]
+            ]
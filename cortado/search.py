@@ -0,0 +1,185 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Fuzzy restaurant names for typeahead and duplicate checks.
+#
+# Trigrams are made the way pg_trgm makes them (each word padded with two
+# spaces in front and one behind), so the in-process index and a pg_trgm
+# backed query agree on what is similar. Postgres uses the GIN index from
+# cortado.migrations when the extension is there, everything else uses
+# RestaurantIndex.
+
+# =============== // STANDARD IMPORT // ===============
+
+import re
+import unicodedata
+from collections import defaultdict
+
+# =============== // LIBRARY IMPORT // ===============
+
+import numpy as np
+
+# Share of a restaurant's trigrams that has to match before it is suggested
+SUGGEST_THRESHOLD = 0.3
+
+# Address matches count for less than name matches
+ADDRESS_WEIGHT = 0.5
+
+# Names at least this similar are flagged as likely duplicates
+DUPLICATE_THRESHOLD = 0.5
+
+# A name this long (in trigrams) that sits almost wholly inside another is a
+# likely duplicate too, e.g. "Vovo Telo" and "Vovo Telo Bakery & Café". Short
+# ones like "Café" are inside far too many names to mean anything.
+CONTAINED_MIN_TRIGRAMS = 8
+CONTAINED_THRESHOLD = 0.8
+
+
+def normalise(text: str | None) -> list[str]:
+    # "Café  Rosetta!" -> ["cafe", "rosetta"]
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return re.findall(r"[^\W_]+", text)
+
+
+def trigrams(text: str | None, prefix: bool = False) -> frozenset[str]:
+    # With prefix=True the last word may still be half typed, so it doesn't
+    # get the trailing space trigram that would only match a whole word
+    words = normalise(text)
+    grams = set()
+    for i, word in enumerate(words):
+        padded = f"  {word}" if prefix and i == len(words) - 1 else f"  {word} "
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    # pg_trgm's similarity(): shared trigrams over all trigrams
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def containment(query: frozenset[str], target: frozenset[str]) -> float:
+    # Share of the query found in the target, close to pg_trgm's word_similarity()
+    if not query:
+        return 0.0
+    return len(query & target) / len(query)
+
+
+def duplicate_score(a: frozenset[str], b: frozenset[str]) -> float:
+    score = similarity(a, b)
+    shorter, longer = sorted((a, b), key=len)
+    if len(shorter) >= CONTAINED_MIN_TRIGRAMS and containment(shorter, longer) >= CONTAINED_THRESHOLD:
+        score = max(score, containment(shorter, longer))
+    return score
+
+
+class RestaurantIndex:
+    # Inverted index from trigram to restaurant positions. A lookup counts the
+    # shared trigrams of every restaurant in one bincount over the query's
+    # posting lists, so common trigrams ("caf", "cof") stay cheap.
+
+    def __init__(self):
+        self.restaurants: list[dict] = []
+        self.last_id: str | None = None
+        self._positions: dict[str, int] = {}
+        self._name_sizes: list[int] = []
+        self._postings = {"name": defaultdict(list), "address": defaultdict(list)}
+        self._frozen = {"name": {}, "address": {}}
+        self._sizes = None
+
+    def __len__(self) -> int:
+        return len(self.restaurants)
+
+    def add(self, rows) -> "RestaurantIndex":
+        # Rows need id, name and address. Ones already in the index are skipped.
+        for row in rows:
+            if row["id"] in self._positions:
+                continue
+            position = len(self.restaurants)
+            self._positions[row["id"]] = position
+            self.restaurants.append({"id": row["id"], "name": row["name"], "address": row["address"]})
+            names = trigrams(row["name"])
+            self._name_sizes.append(len(names))
+            for gram in names:
+                self._postings["name"][gram].append(position)
+            for gram in trigrams(row["address"]):
+                self._postings["address"][gram].append(position)
+            self.last_id = max(self.last_id or row["id"], row["id"])
+        # Posting arrays are rebuilt on demand
+        self._frozen = {"name": {}, "address": {}}
+        self._sizes = None
+        return self
+
+    def _posting(self, field: str, gram: str) -> np.ndarray:
+        frozen = self._frozen[field]
+        if gram not in frozen:
+            frozen[gram] = np.array(self._postings[field].get(gram, ()), dtype=np.int32)
+        return frozen[gram]
+
+    def _shared(self, field: str, grams: frozenset[str]) -> np.ndarray:
+        # Number of the query's trigrams each restaurant has
+        postings = [self._posting(field, gram) for gram in grams]
+        return np.bincount(np.concatenate(postings), minlength=len(self)) if postings else np.zeros(len(self))
+
+    def _top(self, scores: np.ndarray, threshold: float, limit: int) -> list[int]:
+        hits = np.flatnonzero(scores >= threshold)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+        # Best match first, then the shorter (more exact) name
+        return sorted(hits.tolist(), key=lambda position: (-scores[position], len(self.restaurants[position]["name"])))
+
+    def suggest(self, query: str, limit: int = 10, threshold: float = SUGGEST_THRESHOLD) -> list[dict]:
+        grams = trigrams(query, prefix=True)
+        if not grams or not len(self):
+            return []
+        scores = np.maximum(
+            self._shared("name", grams) / len(grams),
+            ADDRESS_WEIGHT * self._shared("address", grams) / len(grams)
+        )
+        return [{**self.restaurants[p], "score": float(scores[p])} for p in self._top(scores, threshold, limit)]
+
+    def duplicates(self, name: str, threshold: float = DUPLICATE_THRESHOLD, limit: int = 5) -> list[dict]:
+        # duplicate_score() for every restaurant at once
+        grams = trigrams(name)
+        if not grams or not len(self):
+            return []
+        shared = self._shared("name", grams)
+        if self._sizes is None:
+            self._sizes = np.array(self._name_sizes)
+        sizes = self._sizes
+        scores = shared / (sizes + len(grams) - shared)
+        shorter = np.minimum(sizes, len(grams))
+        contained = shared / np.maximum(shorter, 1)
+        contained[(shorter < CONTAINED_MIN_TRIGRAMS) | (contained < CONTAINED_THRESHOLD)] = 0.0
+        scores = np.maximum(scores, contained)
+        return [{**self.restaurants[p], "score": float(scores[p])} for p in self._top(scores, threshold, limit)]
+
+
+class DuplicateRestaurant(Exception):
+    # Raised instead of adding a restaurant that looks like one we already
+    # have. Pick one of the candidates (DC.Restaurant.id) or pass
+    # allow_new_restaurant=True to add it anyway.
+
+    def __init__(self, name: str, candidates: list[dict]):
+        super().__init__(
+            f"'{name}' looks like " + ", ".join(f"'{c['name']}'" for c in candidates)
+        )
+        self.name = name
+        self.candidates = candidates
+
+
+class UnknownRestaurant(LookupError):
+    # DC.Restaurant.id points at a restaurant that doesn't exist
+
+    def __init__(self, restaurant_id: str):
+        super().__init__(f"Unknown restaurant id '{restaurant_id}'")
+        self.restaurant_id = restaurant_id
@@ -0,0 +1,131 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterator
+
+# =============== // LIBRARY IMPORT // ===============
+
+from sqlalchemy import Engine, Table
+from ulid import ULID
+
+# =============== // MODULE IMPORT // ===============
+
+import cortado.datastructures as ds
+
+# Fake but believable data for local databases, benchmarks and load tests
+
+CITIES = {
+    "Johannesburg": (-26.2041, 28.0473),
+    "Pretoria": (-25.7479, 28.2293),
+    "Cape Town": (-33.9249, 18.4241),
+    "Durban": (-29.8587, 31.0218),
+}
+PREFIXES = ["Vovo Telo", "Bean There", "Father", "Motherland", "Seattle", "Tashas", "Doppio", "Truth", "Rosetta", "Origin"]
+SUFFIXES = ["Coffee", "Bakery & Café", "Roastery", "Espresso Bar", "Café", "Deli"]
+NOTES = [None, None, None, "Very lekker", "Too milky", "Perfect ratio", "Burnt", "Would come back"]
+
+
+def _stamped(ts: datetime) -> dict:
+    return {
+        "id": str(ULID.from_datetime(ts)),
+        "created_at": ts,
+        "last_updated_at": ts,
+    }
+
+
+def fake_users(n: int, start: datetime, rng: random.Random) -> list[dict]:
+    return [
+        {**_stamped(start), "name": f"user_{i:07d}", "email": f"user_{i:07d}@example.com"}
+        for i in range(n)
+    ]
+
+
+def fake_restaurants(n: int, start: datetime, rng: random.Random) -> list[dict]:
+    restaurants = []
+    for i in range(n):
+        city, (lat, lon) = rng.choice(list(CITIES.items()))
+        restaurants.append({
+            **_stamped(start),
+            "name": f"{rng.choice(PREFIXES)} {rng.choice(SUFFIXES)} #{i}",
+            "address": f"{rng.randint(1, 400)} Main Road, {city}, South Africa",
+            "google_place_id": f"fake-place-{i:07d}",
+            "latitude": round(lat + rng.uniform(-0.15, 0.15), 6),
+            "longitude": round(lon + rng.uniform(-0.15, 0.15), 6),
+            "website": None,
+            "restaurant_rating": round(rng.uniform(3.0, 5.0), 1),
+        })
+    return restaurants
+
+
+def fake_ratings(
+    n: int,
+    user_ids: list[str],
+    restaurant_ids: list[str],
+    start: datetime,
+    end: datetime,
+    rng: random.Random
+) -> Iterator[dict]:
+    # Ratings are generated in time order, like the real append-only table
+    step = (end - start) / max(n, 1)
+    for i in range(n):
+        ts = start + step * i
+        yield {
+            **_stamped(ts),
+            "user_id": rng.choice(user_ids),
+            "restaurant_id": rng.choice(restaurant_ids),
+            "stars": min(5, max(1, round(rng.gauss(3.6, 1.0)))),
+            "price_zar": round(rng.uniform(22, 55) * 2) / 2,
+            "num_shots": rng.choice([None, "single", "double", "double"]),
+            "notes": rng.choice(NOTES),
+            "cookie": rng.random() < 0.3,
+            "take_away": rng.random() < 0.4,
+        }
+
+
+def _insert(engine: Engine, table: Table, rows, batch_size: int) -> None:
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        with engine.begin() as connection:
+            connection.execute(table.insert(), batch)
+
+
+def seed(
+    engine: Engine,
+    n_users: int = 100,
+    n_restaurants: int = 500,
+    n_ratings: int = 10_000,
+    days: int = 365,
+    batch_size: int = 10_000,
+    tables: dict[str, Table] | None = None,
+    rng_seed: int = 42
+) -> dict[str, list[str]]:
+    tables = tables or {
+        "user": ds.User.__table__,
+        "restaurant": ds.Restaurant.__table__,
+        "rating": ds.Rating.__table__,
+    }
+    rng = random.Random(rng_seed)
+    end = ds.utcnow()
+    start = end - timedelta(days=days)
+
+    users = fake_users(n_users, start, rng)
+    restaurants = fake_restaurants(n_restaurants, start, rng)
+    user_ids = [u["id"] for u in users]
+    restaurant_ids = [r["id"] for r in restaurants]
+
+    _insert(engine, tables["user"], users, batch_size)
+    _insert(engine, tables["restaurant"], restaurants, batch_size)
+    _insert(engine, tables["rating"], fake_ratings(n_ratings, user_ids, restaurant_ids, start, end, rng), batch_size)
+    return {"user": user_ids, "restaurant": restaurant_ids}
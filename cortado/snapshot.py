@@ -0,0 +1,145 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from ulid import ULID
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado.cache import REWRITES_VERSION
+from cortado.datastructures import ulid_floor
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout changes so old files are ignored
+SNAPSHOT_FORMAT = "2"
+
+# ULIDs are minted before commit, so a slow transaction can land a slightly
+# older id after the snapshot was taken. The catch-up re-reads this far back.
+CATCH_UP_OVERLAP = timedelta(minutes=5)
+
+
+def default_path() -> Path:
+    # Point this at a persistent volume so new containers start warm
+    return Path(os.getenv(
+        "CORTADO_SNAPSHOT_PATH",
+        os.path.join(tempfile.gettempdir(), "cortado", "ratings.arrow")
+    ))
+
+
+@dataclass
+class Snapshot:
+    df: pd.DataFrame
+    data_version: int
+    rewrite_version: int
+    last_id: str | None
+
+
+def write_snapshot(
+    df: pd.DataFrame,
+    data_version: int,
+    rewrite_version: int,
+    path: Path | None = None
+) -> None:
+    path = path or default_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    last_id = df["id"].max() if not df.empty else None
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"cortado.format": SNAPSHOT_FORMAT.encode(),
+        b"cortado.data_version": str(data_version).encode(),
+        b"cortado.rewrite_version": str(rewrite_version).encode(),
+        b"cortado.last_id": (last_id or "").encode(),
+    })
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    # Uncompressed so the file can be memory-mapped without decoding
+    feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+
+def write_snapshot_in_background(
+    df: pd.DataFrame,
+    data_version: int,
+    rewrite_version: int,
+    path: Path | None = None
+) -> threading.Thread:
+    def write():
+        try:
+            write_snapshot(df, data_version, rewrite_version, path)
+        except Exception:
+            logger.exception("Could not write the ratings snapshot")
+
+    thread = threading.Thread(target=write, name="ratings-snapshot", daemon=True)
+    thread.start()
+    return thread
+
+
+def read_snapshot(path: Path | None = None) -> Snapshot | None:
+    path = path or default_path()
+    try:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+
+    metadata = table.schema.metadata or {}
+    if metadata.get(b"cortado.format") != SNAPSHOT_FORMAT.encode():
+        return None
+    return Snapshot(
+        df=table.to_pandas(),
+        data_version=int(metadata[b"cortado.data_version"]),
+        rewrite_version=int(metadata[b"cortado.rewrite_version"]),
+        last_id=metadata[b"cortado.last_id"].decode() or None,
+    )
+
+
+def load_ratings(cortado, path: Path | None = None) -> tuple[pd.DataFrame, int]:
+    # Serve the snapshot plus whatever was rated since, and refresh the file
+    # in the background for the next cold start. The file is memory-mapped
+    # but still copied into pandas, so this saves the query, not the copy.
+    data_version = cortado.data_version()
+    rewrite_version = cortado.data_version(REWRITES_VERSION)
+    snapshot = read_snapshot(path)
+    if snapshot is not None and "id" not in snapshot.df:
+        # Written from an empty database, it has no columns to catch up on
+        snapshot = None
+
+    if snapshot is not None and snapshot.rewrite_version == rewrite_version:
+        if snapshot.data_version == data_version:
+            return snapshot.df, data_version
+        after_id = None
+        if snapshot.last_id:
+            after_id = ulid_floor(ULID.from_str(snapshot.last_id).datetime - CATCH_UP_OVERLAP)
+        delta = pd.DataFrame(cortado.get_ratings(after_id=after_id))
+        df = snapshot.df
+        if not delta.empty:
+            df = pd.concat([df[~df["id"].isin(delta["id"])], delta], ignore_index=True)
+    else:
+        df = pd.DataFrame(cortado.get_ratings())
+
+    # No ratings at all means no columns either, nothing worth keeping
+    if "id" in df:
+        write_snapshot_in_background(df, data_version, rewrite_version, path)
+    return df, data_version
@@ -0,0 +1,109 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# The parts pages/restaurant.py and pages/user.py share, and the one Cortado
+# instance every page and main.py use
+
+# =============== // LIBRARY IMPORT // ===============
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado import Cortado
+
+# After the date and who rated it (or where)
+HISTORY_COLUMNS = {
+    "stars": "Rating",
+    "num_shots": "Number of Shots",
+    "price_zar": "Price (ZAR)",
+    "cookie": "Cookie?",
+    "take_away": "Take Away?",
+    "notes": "Notes"
+}
+
+
+# No TTL, Cortado checks data versions itself and keeps the fitted
+# recommender and search index between reruns. Defined only here so the
+# whole process shares one.
+@st.cache_resource
+def get_cortado_instance():
+    return Cortado()
+
+
+def select_entity(label: str, entities: pd.DataFrame) -> str:
+    # ?id=<id> links straight to one of them
+    ids = entities["id"].tolist()
+    names = dict(zip(ids, entities["name"]))
+    requested = st.query_params.get("id")
+    selected = st.selectbox(
+        label,
+        options=ids,
+        index=ids.index(requested) if requested in ids else 0,
+        format_func=lambda i: names.get(i, i)
+    )
+    st.query_params["id"] = selected
+    return selected
+
+
+def price_range(summary: dict) -> str:
+    if summary["min_price"] is None:
+        return "N/A"
+    return f"R {summary['min_price']:.0f} – R {summary['max_price']:.0f}"
+
+
+def metrics_view(metrics: dict[str, str]) -> None:
+    for col, (label, value) in zip(st.columns(len(metrics)), metrics.items()):
+        with col:
+            st.metric(label, value)
+
+
+def create_trend_chart(trend):
+    trend = trend.astype({"average_rating": float, "average_price": float})
+    return px.line(
+        trend,
+        x="period",
+        y=["average_rating", "average_price"],
+        markers=True,
+        facet_row="variable",
+        labels={"period": "Month", "value": ""},
+        template="plotly_white",
+        height=450
+    ).update_yaxes(matches=None)
+
+
+def create_shot_mix_chart(shots):
+    shots = shots.assign(num_shots=shots["num_shots"].fillna("unknown"))
+    return px.pie(shots, names="num_shots", values="ratings", template="plotly_white", height=300)
+
+
+def trend_view(trend, shots):
+    # Trend across the page, then shot sizes in the left column. The right
+    # column is returned for whatever the page shows next to it.
+    st.subheader("📈 Trend")
+    st.plotly_chart(create_trend_chart(trend), use_container_width=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("☕ Shot Sizes")
+        st.plotly_chart(create_shot_mix_chart(shots), use_container_width=True)
+    return col2
+
+
+def history_view(ratings, other: str, other_label: str) -> None:
+    # `other` is the column naming the other side, the user or the restaurant
+    columns = {"created_at": "Date", other: other_label, **HISTORY_COLUMNS}
+    st.subheader("📋 History")
+    st.dataframe(
+        ratings.sort_values("created_at", ascending=False)[list(columns)].rename(columns=columns),
+        use_container_width=True,
+        hide_index=True
+    )
@@ -0,0 +1,221 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# Query plan checks for the hot queries.
+#
+# Seeds a scratch schema with a year of ratings, then runs EXPLAIN ANALYZE on
+# every query the dashboard, the API and new_rating lean on. Each one has to
+# use the index it was written for, must not scan the whole rating table,
+# has to estimate its row counts within reason, and must keep the plan shape
+# and not get much slower than what is recorded in query_plans.json.
+#
+# Re-record the baselines after an intended change (and commit the diff):
+#
+#   CORTADO_RECORD_PLANS=1 pytest integration/test_query_plans.py
+
+# =============== // STANDARD IMPORT // ===============
+
+import json
+import os
+from datetime import timedelta
+from pathlib import Path
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pytest
+from sqlalchemy import create_engine, make_url, select, text, update
+
+# =============== // MODULE IMPORT // ===============
+
+import cortado.datastructures as ds
+import cortado.queries as Q
+from cortado.db_utils import CortadoDB
+from cortado.migrations import run_migrations
+from cortado.seed import seed
+
+SCHEMA = "cortado_plans"
+BASELINES = Path(__file__).with_name("query_plans.json")
+RECORD = os.getenv("CORTADO_RECORD_PLANS") == "1"
+
+N_USERS = 2_000
+N_RESTAURANTS = 5_000
+N_RATINGS = 200_000
+
+# Execution time may drift this far past its baseline (machines differ)
+SLOWDOWN_FACTOR = 5
+SLOWDOWN_SLACK_MS = 5.0
+
+# Estimated vs actual rows, either way
+ROW_ESTIMATE_FACTOR = 10
+
+# name -> (statement, index that must be used)
+HotQueries = dict[str, tuple[object, str]]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    url = make_url(CortadoDB().object_url)
+    if url.get_backend_name() != "postgresql":
+        pytest.skip("Query plans are checked on Postgres only")
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    ds.Base.metadata.create_all(engine)
+    run_migrations(engine)
+    engine.seeded = seed(engine, N_USERS, N_RESTAURANTS, N_RATINGS, days=365)
+    with engine.begin() as connection:
+        # About one in five restaurants was typed in by hand, without a place id
+        connection.execute(
+            update(ds.Restaurant)
+            .where(ds.Restaurant.id.in_(engine.seeded["restaurant"][::5]))
+            .values(google_place_id=None, latitude=None, longitude=None)
+        )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        # Only our tables, the rest of the database isn't ours to vacuum
+        for table in ds.Base.metadata.sorted_tables:
+            connection.execute(text(f'VACUUM ANALYZE "{SCHEMA}"."{table.name}"'))
+    yield engine
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    engine.dispose()
+
+
+def hot_queries(engine) -> HotQueries:
+    restaurant_id = engine.seeded["restaurant"][42]
+    user_id = engine.seeded["user"][42]
+    with engine.connect() as connection:
+        place_id = connection.execute(
+            select(ds.Restaurant.google_place_id).where(ds.Restaurant.id == restaurant_id)
+        ).scalar()
+        manual_name = connection.execute(
+            select(ds.Restaurant.name).where(ds.Restaurant.id == engine.seeded["restaurant"][40])
+        ).scalar()
+        user_name = connection.execute(select(ds.User.name).where(ds.User.id == user_id)).scalar()
+        middle_id = connection.execute(
+            select(ds.Rating.id).order_by(ds.Rating.id).offset(N_RATINGS // 2).limit(1)
+        ).scalar()
+    last_day = ds.ulid_floor(ds.utcnow() - timedelta(days=1))
+
+    return {
+        # main.get_ratings_data and the API, per period
+        "ratings_last_7_days": (Q.ratings_join(since=Q.since_days(7)), "ix_rating_created_at"),
+        "statistics_last_30_days": (Q.statistics(since=Q.since_days(30)), "ix_rating_created_at"),
+        # Snapshot catch-up and recommender updates
+        "ratings_after_id": (Q.ratings_join(after_id=last_day), "rating_pkey"),
+        "rating_matrix_after_id": (Q.rating_matrix(after_id=last_day), "rating_pkey"),
+        # GET /ratings keyset pages
+        "ratings_page": (
+            Q.ratings_join(after_id=middle_id).order_by(ds.Rating.id).limit(100), "rating_pkey"
+        ),
+        # Restaurant and user pages
+        "restaurant_ratings": (Q.ratings_join(restaurant_id=restaurant_id), "ix_rating_restaurant_id_created_at"),
+        "restaurant_summary": (Q.restaurant_summary(restaurant_id), "ix_rating_restaurant_id_created_at"),
+        "user_trend": (Q.rating_trend(user_id=user_id), "ix_rating_user_id_created_at"),
+        # Cortado.new_rating lookups
+        "restaurant_by_place_id": (Q.restaurant_by_place_id(place_id), "ix_restaurant_google_place_id"),
+        "manual_restaurant_by_name": (Q.manual_restaurant_by_name(manual_name), "ix_restaurant_manual_name"),
+        "user_by_name": (Q.user_by_name(user_name), "ix_user_name"),
+    }
+
+
+def explain(engine, stmt) -> dict:
+    # Bound parameters are inlined so EXPLAIN sees the same literals the
+    # planner would get from a real call
+    sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        [plan] = connection.exec_driver_sql(
+            "EXPLAIN (ANALYZE, FORMAT JSON) " + sql.replace("%", "%%")
+        ).scalar()
+    return plan
+
+
+def nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from nodes(child)
+
+
+def estimated_nodes(plan: dict):
+    # Nodes under a Limit stop early, so their estimates are for a full run
+    yield plan
+    if plan["Node Type"] != "Limit":
+        for child in plan.get("Plans", ()):
+            yield from estimated_nodes(child)
+
+
+def shape(plan: dict, depth: int = 0) -> list[str]:
+    # One readable line per node, kept in the baselines file for review
+    line = "  " * depth + plan["Node Type"]
+    if "Index Name" in plan:
+        line += f" using {plan['Index Name']}"
+    if "Relation Name" in plan:
+        line += f" on {plan['Relation Name']}"
+    return [line] + [row for child in plan.get("Plans", ()) for row in shape(child, depth + 1)]
+
+
+@pytest.fixture(scope="module")
+def measured(engine):
+    results = {}
+    for name, (stmt, index) in hot_queries(engine).items():
+        # Best of three, the first run also warms the cache
+        runs = [explain(engine, stmt) for _ in range(3)]
+        results[name] = (min(runs, key=lambda run: run["Execution Time"]), index)
+    yield results
+    if RECORD:
+        BASELINES.write_text(json.dumps({
+            name: {"execution_ms": round(run["Execution Time"], 3), "plan": shape(run["Plan"])}
+            for name, (run, _) in sorted(results.items())
+        }, indent=2) + "\n")
+
+
+def test_hot_queries_use_their_indexes(measured):
+    for name, (run, index) in measured.items():
+        plan = list(nodes(run["Plan"]))
+        used = {node.get("Index Name") for node in plan}
+        assert index in used, f"{name} no longer uses {index}:\n" + "\n".join(shape(run["Plan"]))
+        full_scans = [node for node in plan if node["Node Type"] == "Seq Scan" and node["Relation Name"] == "rating"]
+        assert not full_scans, f"{name} scans the whole rating table:\n" + "\n".join(shape(run["Plan"]))
+
+
+def test_row_estimates(measured):
+    for name, (run, _) in measured.items():
+        for node in estimated_nodes(run["Plan"]):
+            if "Index Name" not in node:
+                continue
+            estimated, actual = max(node["Plan Rows"], 1), max(node["Actual Rows"], 1)
+            assert 1 / ROW_ESTIMATE_FACTOR <= estimated / actual <= ROW_ESTIMATE_FACTOR, (
+                f"{name}: {node['Node Type']} using {node['Index Name']} "
+                f"estimated {node['Plan Rows']} rows but read {node['Actual Rows']}"
+            )
+
+
+@pytest.mark.skipif(RECORD, reason="recording new baselines")
+def test_plan_shape_baselines(measured):
+    # Node types and index names, a changed plan needs a reviewed re-record
+    baselines = json.loads(BASELINES.read_text())
+    assert set(baselines) == set(measured), "Hot queries changed, re-record query_plans.json"
+    for name, (run, _) in measured.items():
+        assert shape(run["Plan"]) == baselines[name]["plan"], (
+            f"{name} changed plan, was:\n" + "\n".join(baselines[name]["plan"])
+            + "\nnow:\n" + "\n".join(shape(run["Plan"]))
+        )
+
+
+@pytest.mark.skipif(RECORD, reason="recording new baselines")
+def test_execution_time_baselines(measured):
+    baselines = json.loads(BASELINES.read_text())
+    assert set(baselines) == set(measured), "Hot queries changed, re-record query_plans.json"
+    for name, (run, _) in measured.items():
+        limit = baselines[name]["execution_ms"] * SLOWDOWN_FACTOR + SLOWDOWN_SLACK_MS
+        assert run["Execution Time"] <= limit, (
+            f"{name} took {run['Execution Time']:.1f} ms, baseline {baselines[name]['execution_ms']} ms:\n"
+            + "\n".join(shape(run["Plan"]))
+        )
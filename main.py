@@ -11,6 +11,7 @@
 # =============== // STANDARD IMPORT // ===============
 
 import os
+import tempfile
 from datetime import datetime
 
 # =============== // LIBRARY IMPORT // ===============
@@ -18,13 +19,18 @@ from datetime import datetime
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 import folium
 from streamlit_folium import st_folium
 
 # =============== // MODULE IMPORT // ===============
 
-from cortado.db_utils import CortadoDB
-from cortado.datastructures import Rating, Restaurant, User
+from cortado import Q
+from cortado import prices, profiling
+from cortado.export import FORMATS
+from cortado.snapshot import load_ratings
+from detail_views import get_cortado_instance
 
 # =============== // PAGE CONFIG // ===============
 
@@ -37,59 +43,53 @@ st.set_page_config(
 # =============== // CACHING FUNCTIONS // ===============
 
 
-@st.cache_data(ttl=30)
-def get_ratings_data():
-    try:
-        db = CortadoDB()
-        session = db.get_session()
-        ratings_query = session.query(
-            Rating.id,
-            Rating.stars,
-            Rating.price_zar,
-            Rating.notes,
-            Rating.cookie,
-            Rating.take_away,
-            Rating.num_shots,
-            Rating.created_at,
-            Restaurant.name.label('restaurant_name'),
-            Restaurant.address,
-            Restaurant.latitude,
-            Restaurant.longitude,
-            Restaurant.restaurant_rating,
-            User.name.label('user_name'),
-            User.email
-        ).join(Restaurant).join(User)
-
-        ratings = ratings_query.all()
-        session.close()
-
-        data = []
-        for rating in ratings:
-            data.append({
-                'id': rating.id,
-                'stars': rating.stars,
-                'price_zar': rating.price_zar,
-                'notes': rating.notes,
-                'cookie': rating.cookie,
-                'num_shots': rating.num_shots,
-                'take_away': rating.take_away,
-                'created_at': datetime.fromtimestamp(rating.created_at),
-                'restaurant_name': rating.restaurant_name,
-                'address': rating.address,
-                'latitude': rating.latitude,
-                'longitude': rating.longitude,
-                'restaurant_rating': rating.restaurant_rating,
-                'user_name': rating.user_name,
-                'email': rating.email
-            })
-        return pd.DataFrame(data)
-    except Exception as e:
-        st.error(f"Error fetching data: {e}")
-        return pd.DataFrame()
+def on_ratings_changed(change):
+    # Only the datasets built from the ratings join go stale
+    if change["table"] in ("rating", "restaurant", "user", "*"):
+        get_ratings_data.clear()
+        get_statistics.clear()
+        get_price_chart.clear()
+        get_price_analytics.clear()
+
+
+@st.cache_resource
+def get_change_listener():
+    listener = get_cortado_instance().change_listener()
+    listener.subscribe(on_ratings_changed)
+    listener.start()
+    return listener
+
+
+def window_key(days):
+    # The window slides without new data, so its start hour is in every key
+    # built from it
+    since = Q.since_days(days)
+    return "all" if since is None else f"{days}:{since:%Y%m%d%H}"
+
+
+# Invalidated by get_change_listener(), the TTL is only a safety net.
+# All time comes from the on-disk snapshot plus the ratings added since it was
+# written. Windows sit behind the shared cache, keyed by data version, so only
+# the first replica to see a new version runs the join. Errors are raised,
+# not returned, so they never end up in the cache.
+@st.cache_data(ttl=3600)
+def get_ratings_data(days=None, window="all"):
+    cortado = get_cortado_instance()
+    if days is None:
+        return load_ratings(cortado)
+    version = cortado.data_version()
+    since = Q.since_days(days)
+    df = cortado.cache.get_or_compute(
+        f"ratings:{window}",
+        version,
+        lambda: pd.DataFrame(cortado.get_ratings(since=since)),
+        codec="frame",
+        ttl=3600
+    )
+    return df, version
 
 
-@st.cache_data(ttl="300s")
-def get_statistics(df):
+def compute_statistics(df):
     if df.empty:
         return {
             'total_ratings': 0,
@@ -101,32 +101,143 @@ def get_statistics(df):
             'average_price': 0,
             'total_spent': 0
         }
-    price_non_na = df['price_zar'].dropna()
+    price = prices.as_prices(df['price_zar'])
+    priced = ~pd.isna(price)
     return {
         'total_ratings': len(df),
-        'average_rating': df['stars'].mean(),
+        'average_rating': float(df['stars'].mean()),
         'total_cookies': int(df['cookie'].sum()),
         'total_take_always': int(df['take_away'].sum()),
-        'unique_restaurants': df['restaurant_name'].nunique(),
-        'unique_users': df['user_name'].nunique(),
-        'average_price': price_non_na.mean() if not price_non_na.empty else 0,
-        'total_spent': price_non_na.sum() if not price_non_na.empty else 0
+        'unique_restaurants': int(df['restaurant_name'].nunique()),
+        'unique_users': int(df['user_name'].nunique()),
+        'average_price': float(price[priced].mean()) if priced.any() else 0,
+        'total_spent': prices.total_spent(price)
+    }
+
+
+# The leading underscore stops Streamlit from hashing the DataFrame, the
+# (window, version) pair already identifies it
+@st.cache_data(ttl="300s")
+def get_statistics(_df, window, version):
+    return get_cortado_instance().cache.get_or_compute(
+        f"statistics:{window}",
+        version,
+        lambda: compute_statistics(_df),
+        ttl=3600
+    )
+
+
+@st.cache_data(ttl="300s")
+def get_price_chart(_df, window, version):
+    fig_json = get_cortado_instance().cache.get_or_compute(
+        f"price_chart:{window}",
+        version,
+        lambda: create_price_vs_rating_scatter(_df).to_json().encode(),
+        codec="bytes",
+        ttl=3600
+    )
+    return pio.from_json(fig_json)
+
+
+def compute_price_analytics(df):
+    priced = prices.frame(df)
+    return {
+        'percentiles': prices.percentiles(priced['price'].to_numpy()),
+        'histogram': prices.histogram(priced['price'].to_numpy()),
+        'restaurants': prices.restaurant_prices(priced, min_ratings=3),
+        'shots': prices.shot_prices(priced),
+        'drift': prices.price_drift(priced),
     }
 
 
+# Everything in here is already aggregated down to a few hundred rows, so the
+# charts drawn from it cost the same at 1k or 1M ratings
+@st.cache_data(ttl="300s")
+def get_price_analytics(_df, window, version):
+    return compute_price_analytics(_df)
+
+
+def export_file(fmt, filters):
+    # Runs only when the download button is clicked. Spills to disk past 8 MB
+    # so large exports don't sit in memory while they are being written.
+    file = tempfile.SpooledTemporaryFile(max_size=8 * 2**20)
+    for chunk in get_cortado_instance().export_ratings(fmt=fmt, **filters):
+        file.write(chunk)
+    file.seek(0)
+    return file
+
+
 def clear_and_rerun():
-    st.cache_data.clear()
-    st.cache_resource.clear()
+    get_ratings_data.clear()
+    get_statistics.clear()
+    get_price_chart.clear()
+    get_price_analytics.clear()
     st.rerun()
 
 
+@st.fragment(run_every=1)
+def watch_for_changes(version):
+    # Cheap per-session check, the listener thread does the actual waiting
+    if get_change_listener().version != version:
+        st.rerun()
+
+
 # =============== // VISUALIZATION FUNCTIONS // ===============
 
 
+# Past this many priced ratings, or restaurants for the legend, the price vs
+# rating chart plots aggregates with WebGL instead of every rating
+LARGE_CHART_RATINGS = 2_000
+LEGEND_TOP = 15
+
+
+def create_price_vs_rating_overview(priced):
+    # A fixed size figure: at most 60 price bins x 5 stars for every rating,
+    # plus one point per restaurant in the legend
+    bins = prices.price_star_bins(priced)
+    restaurants = prices.restaurant_prices(priced)
+    top = restaurants.nlargest(LEGEND_TOP, 'ratings')
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=bins['price'],
+        y=bins['stars'],
+        mode='markers',
+        name='All ratings',
+        customdata=bins['ratings'],
+        marker=dict(
+            size=4 + 26 * (bins['ratings'] / bins['ratings'].max()) ** 0.5,
+            color='#B0B0B0',
+            opacity=0.6
+        ),
+        hovertemplate="R%{x:.0f} · %{y}★<br>%{customdata} ratings<extra></extra>"
+    ))
+    for restaurant in top.itertuples():
+        fig.add_trace(go.Scattergl(
+            x=[restaurant.median_price],
+            y=[restaurant.average_rating],
+            mode='markers',
+            name=restaurant.restaurant_name,
+            customdata=[restaurant.ratings],
+            marker=dict(size=8 + 22 * (restaurant.ratings / top['ratings'].max()) ** 0.5),
+            hovertemplate="%{fullData.name}<br>Median R%{x:.2f} · %{y:.2f}★<br>%{customdata} ratings<extra></extra>"
+        ))
+    fig.update_layout(
+        title="💰 Price vs Rating Analysis",
+        xaxis_title="Price (ZAR)",
+        yaxis_title="Stars",
+        legend_title=f"Top {len(top)} of {len(restaurants)} restaurants",
+        template="plotly_white",
+        height=500
+    )
+    return fig
+
+
 def create_price_vs_rating_scatter(df):
     if df.empty or df['price_zar'].isna().all():
         return None
     df_clean = df.dropna(subset=['price_zar'])
+    if len(df_clean) > LARGE_CHART_RATINGS or df_clean['restaurant_name'].nunique() > LEGEND_TOP:
+        return create_price_vs_rating_overview(prices.frame(df_clean))
     fig = px.scatter(
         df_clean,
         x='price_zar',
@@ -143,6 +254,88 @@ def create_price_vs_rating_scatter(df):
     return fig
 
 
+def create_price_histogram(histogram, percentiles):
+    fig = px.bar(
+        histogram,
+        x='price',
+        y='ratings',
+        labels={'price': 'Price (ZAR)', 'ratings': 'Ratings'},
+        title="🧾 Price Distribution"
+    )
+    fig.update_traces(width=histogram['width'])
+    for q, color in ((25, 'grey'), (50, 'black'), (75, 'grey')):
+        if not pd.isna(percentiles[q]):
+            fig.add_vline(x=percentiles[q], line_dash='dash', line_color=color, annotation_text=f"P{q}")
+    fig.update_layout(template="plotly_white", height=400, bargap=0)
+    return fig
+
+
+def create_value_chart(restaurants, top=10):
+    best = restaurants.nlargest(top, 'value').sort_values('value')
+    fig = px.bar(
+        best,
+        x='value',
+        y='restaurant_name',
+        orientation='h',
+        hover_data={'median_price': ':.2f', 'average_rating': ':.2f', 'ratings': True},
+        labels={'value': 'Stars per Rand', 'restaurant_name': ''},
+        title="🏆 Best Value for Money"
+    )
+    fig.update_layout(template="plotly_white", height=400)
+    return fig
+
+
+def create_shot_price_chart(shots):
+    fig = px.bar(
+        shots,
+        x='num_shots',
+        y='median',
+        error_y=shots['p75'] - shots['median'],
+        error_y_minus=shots['median'] - shots['p25'],
+        hover_data=['ratings'],
+        labels={'num_shots': 'Number of Shots', 'median': 'Median Price per Shot (ZAR)'},
+        title="☕ Price per Shot"
+    )
+    fig.update_layout(template="plotly_white", height=400)
+    return fig
+
+
+def create_price_drift_chart(drift):
+    fig = px.line(
+        drift,
+        x='period',
+        y='median_price',
+        color='restaurant_name',
+        markers=True,
+        hover_data={'drift_pct': ':+.1f', 'ratings': True},
+        labels={'period': 'Month', 'median_price': 'Median Price (ZAR)', 'restaurant_name': 'Restaurant'},
+        title="📈 Price Drift at the Busiest Restaurants"
+    )
+    fig.update_layout(template="plotly_white", height=450)
+    return fig
+
+
+def price_analytics_view(analytics):
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            create_price_histogram(analytics['histogram'], analytics['percentiles']),
+            use_container_width=True
+        )
+    with col2:
+        if analytics['restaurants'].empty:
+            st.info("Value for money needs at least 3 priced ratings per restaurant.")
+        else:
+            st.plotly_chart(create_value_chart(analytics['restaurants']), use_container_width=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        if not analytics['shots'].empty:
+            st.plotly_chart(create_shot_price_chart(analytics['shots']), use_container_width=True)
+    with col2:
+        if analytics['drift']['period'].nunique() > 1:
+            st.plotly_chart(create_price_drift_chart(analytics['drift']), use_container_width=True)
+
+
 def create_map_view(df):
     if df.empty or df[['latitude', 'longitude']].isna().all().all():
         return None
@@ -239,12 +432,79 @@ def quick_stats_view(stats):
     st.markdown("---")
 
 
+def create_profile_icicle(tree):
+    fig = px.icicle(
+        tree,
+        ids='id',
+        names='function',
+        parents='parent',
+        values='seconds',
+        branchvalues='total',
+        title="🧊 Where the Time Went"
+    )
+    fig.update_traces(hovertemplate="%{label}<br>%{value:.3f}s (%{percentRoot:.1%} of the run)<extra></extra>")
+    fig.update_layout(template="plotly_white", height=600, margin=dict(t=50, l=0, r=0, b=0))
+    return fig
+
+
+def profile_view(report):
+    with st.expander(f"⏱️ Profile of this run: {report.seconds:.2f}s", expanded=True):
+        st.caption(f"Saved to `{report.path}` (open with snakeviz or `python -m pstats`)")
+        hot_tab, breakdown_tab = st.tabs(["🔥 Hot Functions", "🧊 Breakdown"])
+        with hot_tab:
+            st.dataframe(
+                report.functions,
+                column_config={
+                    "own_s": st.column_config.NumberColumn("Own (s)", format="%.4f"),
+                    "cumulative_s": st.column_config.NumberColumn("Cumulative (s)", format="%.4f"),
+                    "per_call_ms": st.column_config.NumberColumn("Per Call (ms)", format="%.3f"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+        with breakdown_tab:
+            st.plotly_chart(create_profile_icicle(report.tree), use_container_width=True)
+        st.download_button(
+            "⬇️ Download Profile",
+            data=report.path.read_bytes(),
+            file_name=report.path.name,
+            mime="application/octet-stream"
+        )
+
+
+def profiled(run):
+    # Profiles one whole script run, reruns from fragments aren't included
+    profiler = profiling.Profiler(name="dashboard")
+    try:
+        with profiler:
+            run()
+    finally:
+        # st.stop() ends the run with an exception, show what we have anyway
+        if profiler.report is not None:
+            profile_view(profiler.report)
+
+
 def main():
     st.title("☕ Cortado Ratings")
     st.markdown("---")
+    period = st.selectbox(
+        "Period",
+        options=list(Q.PERIODS),
+        index=0
+    )
+    days = Q.PERIODS[period]
+    window = window_key(days)
+    watch_for_changes(get_change_listener().version)
     with st.spinner("Loading delicious data... ☕"):
-        df = get_ratings_data()
-        stats = get_statistics(df)
+        try:
+            df, version = get_ratings_data(days, window)
+        except Exception as e:
+            st.error(f"Error fetching data: {e}")
+            return
+        stats = get_statistics(df, window, version)
+    if df.empty and days is not None:
+        st.info(f"No ratings in the {period.lower()}. Try a longer period.")
+        return
     if df.empty:
         st.warning("No ratings found! Start by adding some ratings.")
         if st.button("⭐ Add Your First Rating", type="primary", use_container_width=True):
@@ -279,9 +539,9 @@ def main():
     with tab2:
         st.subheader("📊 Rating Analytics")
         if not df['price_zar'].isna().all():
-            fig2 = create_price_vs_rating_scatter(df)
-            if fig2:
-                st.plotly_chart(fig2, use_container_width=True)
+            fig2 = get_price_chart(df, window, version)
+            st.plotly_chart(fig2, use_container_width=True)
+            price_analytics_view(get_price_analytics(df, window, version))
     with tab3:
         st.subheader("📋 All Ratings Data")
         col1, col2 = st.columns([1, 3])
@@ -348,10 +608,32 @@ def main():
                 use_container_width=True,
                 hide_index=True
             )
+
+            # The export re-runs the same filters in SQL instead of
+            # serialising the DataFrame
+            filters = {
+                "since": Q.since_days(days),
+                "restaurants": selected_restaurants,
+                "num_shots": [None if pd.isna(n) else n for n in selected_num_shots],
+                "min_stars": min_rating,
+                "cookie_only": show_cookies_only,
+                "take_away_only": show_take_away_only
+            }
+            col_csv, col_parquet = st.columns(2)
+            for col, fmt in ((col_csv, "csv"), (col_parquet, "parquet")):
+                with col:
+                    st.download_button(
+                        f"⬇️ Download {fmt.upper()}",
+                        data=lambda fmt=fmt: export_file(fmt, filters),
+                        file_name=f"cortado_ratings.{fmt}",
+                        mime=FORMATS[fmt],
+                        on_click="ignore",
+                        use_container_width=True
+                    )
     st.markdown("---")
     st.caption(
         f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | "
-        f"Data refreshes every 30 seconds | "
+        f"Data refreshes as soon as new ratings arrive | "
         f"{os.getenv('K_REVISION', '')}"
     )
     if st.button("🔄 Clear Cache & Refresh Data", type="secondary"):
@@ -359,4 +641,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # ?profile=1 or CORTADO_PROFILE=1, otherwise main() runs untouched
+    if profiling.enabled(st.query_params):
+        profiled(main)
+    else:
+        main()
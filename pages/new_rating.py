@@ -20,12 +20,8 @@ from streamlit_star_rating import st_star_rating
 # =============== // MODULE IMPORT // ===============
 
 from googlemaps import googlemaps
-from cortado import Cortado, DC
-
-
-@st.cache_resource(ttl=30)
-def get_cortado_instance():
-    return Cortado()
+from cortado import DC, DuplicateRestaurant
+from detail_views import get_cortado_instance
 
 
 st.set_page_config(
@@ -43,13 +39,14 @@ st.write("Please tell us how you would like to find the restaurant:")
 
 
 def clear_form():
-    for key in ("rating", "location_selector", "form_data"):
+    for key in ("rating", "location_selector", "form_data", "restaurant_search", "duplicates", "allow_new_restaurant"):
         if key in st.session_state:
             del st.session_state[key]
 
     # Clear form data
     st.session_state.form_data = {
         "restaurant": {
+            "id": None,
             "name": "",
             "address": None,
             "google_place_id": None,
@@ -87,6 +84,7 @@ try:
     if location_data:
         st.success(f"✅ Successfully fetched information from: {location_data.get('place_name', 'Unknown')}")
         st.session_state.form_data["restaurant"].update({
+            "id": None,
             "name": location_data.get("place_name", ""),
             "address": location_data.get("formatted_address", ""),
             "google_place_id": location_data.get("place_id"),
@@ -100,6 +98,39 @@ except Exception as e:
     st.info("💡 Try to enter the data in manually")
 
 
+# Typed-in restaurants have no place id to match on, so offer the ones we
+# already have before a near-copy gets added
+search = st.text_input(
+    "🔎 Already rated here? Search our restaurants",
+    key="restaurant_search",
+    placeholder="e.g., Vovo Telo"
+)
+if search.strip():
+    try:
+        suggestions = cortado_instance.suggest_restaurants(search, limit=8)
+    except Exception as e:
+        suggestions = []
+        st.error(f"Error searching restaurants: {e}")
+    if suggestions:
+        options = {s["id"]: s for s in suggestions}
+        chosen = st.radio(
+            "Matching restaurants",
+            options=[None, *options],
+            format_func=lambda i: "None of these" if i is None else (
+                f"{options[i]['name']} – {options[i]['address']}" if options[i]["address"] else options[i]["name"]
+            )
+        )
+        if chosen and chosen != st.session_state.form_data["restaurant"]["id"]:
+            st.session_state.form_data["restaurant"].update({
+                "id": chosen,
+                "name": options[chosen]["name"],
+                "address": options[chosen]["address"],
+            })
+            st.rerun()
+    else:
+        st.caption("No matches, enter the details below.")
+
+
 with st.form("manual_location_form"):
     st.write("**Restaurant Information**")
     col1, col2 = st.columns(2)
@@ -150,7 +181,10 @@ with st.form("manual_location_form"):
     submitted = st.form_submit_button("📍 Save Location Details")
     if submitted:
         if restaurant_name.strip():
+            restaurant_form = st.session_state.form_data["restaurant"]
             st.session_state.form_data["restaurant"].update({
+                # Renaming a chosen restaurant makes it a different one
+                "id": restaurant_form["id"] if restaurant_name == restaurant_form["name"] else None,
                 "name": restaurant_name,
                 "address": address.strip() if address else None,
                 "google_place_id": google_place_id.strip() if google_place_id else None,
@@ -239,6 +273,7 @@ if st.session_state.form_data["restaurant"]["name"]:
                 with st.spinner("Submitting your rating..."):
                     try:
                         restaurant = DC.Restaurant(
+                            id=st.session_state.form_data["restaurant"]["id"],
                             name=st.session_state.form_data["restaurant"]["name"],
                             address=st.session_state.form_data["restaurant"]["address"],
                             google_place_id=st.session_state.form_data["restaurant"]["google_place_id"],
@@ -262,18 +297,41 @@ if st.session_state.form_data["restaurant"]["name"]:
                         cortado_instance.new_rating(
                             restaurant=restaurant,
                             user=user,
-                            rating=rating
+                            rating=rating,
+                            allow_new_restaurant=st.session_state.get("allow_new_restaurant", False)
                         )
                         st.success("✅ Rating submitted successfully!")
                         time.sleep(2)
                         clear_form()
                         st.rerun()
+                    except DuplicateRestaurant as e:
+                        st.session_state.duplicates = e.candidates
                     except Exception as e:
                         print(e)
                         st.error("Please try again or contact support if the problem persists.")
 else:
     st.info("👆 Please select or enter a restaurant location first")
 
+if st.session_state.get("duplicates"):
+    st.warning(
+        f"🤔 We might already have **{st.session_state.form_data['restaurant']['name']}**. "
+        "Pick it below, or tell us it's a new place, then submit again."
+    )
+    for candidate in st.session_state.duplicates:
+        label = f"{candidate['name']} – {candidate['address']}" if candidate["address"] else candidate["name"]
+        if st.button(f"✅ It's {label}", key=f"duplicate_{candidate['id']}"):
+            st.session_state.form_data["restaurant"].update({
+                "id": candidate["id"],
+                "name": candidate["name"],
+                "address": candidate["address"],
+            })
+            st.session_state.duplicates = None
+            st.rerun()
+    if st.button("🆕 It's a new place", key="duplicate_new"):
+        st.session_state.allow_new_restaurant = True
+        st.session_state.duplicates = None
+        st.rerun()
+
 st.divider()
 col1, col2 = st.columns(2)
 
@@ -0,0 +1,91 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // LIBRARY IMPORT // ===============
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+# =============== // MODULE IMPORT // ===============
+
+from detail_views import get_cortado_instance, history_view, metrics_view, price_range, select_entity, trend_view
+
+
+# Each of these only reads the chosen restaurant's rows (see
+# ix_rating_restaurant_id_created_at), so a short TTL is cheap
+@st.cache_data(ttl=60)
+def get_restaurants():
+    return pd.DataFrame(get_cortado_instance().get_restaurants())
+
+
+@st.cache_data(ttl=60)
+def get_restaurant_detail(restaurant_id):
+    cortado = get_cortado_instance()
+    return (
+        cortado.get_restaurant_summary(restaurant_id),
+        pd.DataFrame(cortado.get_ratings(restaurant_id=restaurant_id)),
+        pd.DataFrame(cortado.get_rating_trend(restaurant_id=restaurant_id)),
+        pd.DataFrame(cortado.get_shot_mix(restaurant_id=restaurant_id))
+    )
+
+
+st.set_page_config(
+    page_title="Restaurant",
+    page_icon="🏠"
+)
+
+st.title("🏠 Restaurant")
+
+try:
+    restaurants = get_restaurants()
+except Exception as e:
+    st.error(f"Error fetching restaurants: {e}")
+    st.stop()
+
+if restaurants.empty:
+    st.info("No restaurants yet. Add a rating to get started!")
+    st.stop()
+
+restaurant_id = select_entity("Restaurant", restaurants)
+
+try:
+    summary, ratings, trend, shots = get_restaurant_detail(restaurant_id)
+except Exception as e:
+    st.error(f"Error fetching restaurant details: {e}")
+    st.stop()
+
+if summary["address"]:
+    st.caption(summary["address"])
+
+metrics_view({
+    "Total Ratings": f"{summary['total_ratings']:,} ☕",
+    "Average Rating": f"{summary['average_rating']:.1f}⭐" if summary["average_rating"] is not None else "N/A",
+    "Price Range": price_range(summary),
+    "Google Rating": f"{summary['restaurant_rating']:.1f}⭐" if summary["restaurant_rating"] is not None else "N/A",
+})
+
+if ratings.empty:
+    st.info("Nobody has rated this restaurant yet.")
+    st.stop()
+
+with trend_view(trend, shots):
+    st.subheader("💰 Prices")
+    prices = ratings["price_zar"].dropna().astype(float)
+    if prices.empty:
+        st.info("No prices recorded.")
+    else:
+        st.plotly_chart(
+            px.histogram(prices, nbins=20, labels={"value": "Price (ZAR)"}, template="plotly_white", height=300)
+            .update_layout(showlegend=False),
+            use_container_width=True
+        )
+
+history_view(ratings, "user_name", "User")
@@ -0,0 +1,115 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // LIBRARY IMPORT // ===============
+
+import streamlit as st
+import pandas as pd
+
+# =============== // MODULE IMPORT // ===============
+
+from detail_views import get_cortado_instance, history_view, metrics_view, price_range, select_entity, trend_view
+
+
+# Each of these only reads the chosen user's rows (see
+# ix_rating_user_id_created_at), so a short TTL is cheap
+@st.cache_data(ttl=60)
+def get_users():
+    return pd.DataFrame(get_cortado_instance().get_users())
+
+
+@st.cache_data(ttl=60)
+def get_user_detail(user_id):
+    cortado = get_cortado_instance()
+    return (
+        cortado.get_user_summary(user_id),
+        pd.DataFrame(cortado.get_ratings(user_id=user_id)),
+        pd.DataFrame(cortado.get_rating_trend(user_id=user_id)),
+        pd.DataFrame(cortado.get_shot_mix(user_id=user_id))
+    )
+
+
+st.set_page_config(
+    page_title="My Ratings",
+    page_icon="🙋"
+)
+
+st.title("🙋 My Ratings")
+
+try:
+    users = get_users()
+except Exception as e:
+    st.error(f"Error fetching users: {e}")
+    st.stop()
+
+if users.empty:
+    st.info("No users yet. Add a rating to get started!")
+    st.stop()
+
+user_id = select_entity("User", users)
+
+try:
+    summary, ratings, trend, shots = get_user_detail(user_id)
+except Exception as e:
+    st.error(f"Error fetching user details: {e}")
+    st.stop()
+
+metrics_view({
+    "Total Ratings": f"{summary['total_ratings']:,} ☕",
+    "Restaurants Tried": f"{summary['unique_restaurants']:,} 🏠",
+    "Price Range": price_range(summary),
+    "Total Spent": f"R {summary['total_spent']:.0f}" if summary["total_spent"] else "N/A",
+})
+
+if ratings.empty:
+    st.info("This user hasn't rated anything yet.")
+    st.stop()
+
+with trend_view(trend, shots):
+    st.subheader("🏠 Favourite Spots")
+    favourites = (
+        ratings.groupby("restaurant_name")
+        .agg(ratings=("id", "count"), average_rating=("stars", "mean"))
+        .sort_values(["ratings", "average_rating"], ascending=False)
+        .head(10)
+        .reset_index()
+    )
+    st.dataframe(
+        favourites.rename(columns={
+            "restaurant_name": "Restaurant",
+            "ratings": "Ratings",
+            "average_rating": "Average Rating"
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
+st.subheader("🧭 Try Next")
+try:
+    suggestions = pd.DataFrame(get_cortado_instance().recommend(user_id, k=5))
+except Exception as e:
+    suggestions = pd.DataFrame()
+    st.error(f"Error fetching recommendations: {e}")
+if not suggestions.empty:
+    st.dataframe(
+        suggestions[["restaurant_name", "popularity"]],
+        column_config={
+            "restaurant_name": "Restaurant",
+            "popularity": st.column_config.NumberColumn(
+                "Popularity",
+                format="%.1f⭐",
+                help="Average rating, pulled towards the overall average until a place has a few ratings"
+            ),
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+
+history_view(ratings, "restaurant_name", "Restaurant")
@@ -0,0 +1,155 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+from datetime import timedelta
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pytest
+from starlette.testclient import TestClient
+
+# =============== // MODULE IMPORT // ===============
+
+import cortado.queries as Q
+from cortado.api import create_app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = create_app()
+    yield TestClient(app)
+    app.state.version.close()
+
+
+@pytest.fixture
+def rating_payload(location_data) -> dict:
+    return {
+        "restaurant": {
+            "name": location_data["place_name"],
+            "google_place_id": location_data["place_id"],
+            "latitude": location_data["latitude"],
+            "longitude": location_data["longitude"]
+        },
+        "user": {"name": "johan"},
+        "rating": {"stars": 4, "price_zar": 34.5, "num_shots": "double"}
+    }
+
+
+def test_create_and_page_ratings(client, rating_payload):
+    response = client.post("/ratings", json=rating_payload)
+    assert response.status_code == 201
+    rating_id = response.json()["id"]
+
+    response = client.post("/ratings/batch", json=[rating_payload, rating_payload])
+    assert response.status_code == 201
+    assert len(response.json()["ids"]) == 2
+
+    seen = []
+    after = None
+    while True:
+        params = {"limit": 2, **({"after": after} if after else {})}
+        page = client.get("/ratings", params=params).json()
+        seen += [item["id"] for item in page["items"]]
+        if not (after := page["next"]):
+            break
+    assert rating_id in seen
+    assert seen == sorted(seen)
+
+
+@pytest.mark.parametrize("section, field, value", [
+    ("restaurant", "name", 42),
+    ("restaurant", "name", " "),
+    ("restaurant", "name", "x" * 300),
+    ("restaurant", "website", ["https://vovotelo.co.za"]),
+    ("restaurant", "id", "not-a-ulid"),
+    ("restaurant", "id", 42),
+    ("user", "name", ["johan"]),
+    ("user", "email", "johan@" + "x" * 300),
+    ("rating", "stars", 9),
+    ("rating", "stars", True),
+    ("rating", "price_zar", "thirty"),
+    ("rating", "price_zar", -5),
+    ("rating", "num_shots", "double" * 20),
+    ("rating", "notes", {"milk": "oat"}),
+    ("rating", "cookie", "yes"),
+    ("rating", "take_away", 1),
+])
+def test_rejects_invalid_rating(client, rating_payload, section, field, value):
+    rating_payload[section][field] = value
+    assert client.post("/ratings", json=rating_payload).status_code == 400
+
+
+def test_rejects_invalid_days(client):
+    for days in (0, -7, 9_999_999_999, "week"):
+        assert client.get("/statistics", params={"days": days}).status_code == 400
+    assert client.get("/statistics", params={"days": 36_500}).status_code == 200
+
+
+def test_rejects_invalid_limits(client):
+    for limit in (0, -1, "many"):
+        assert client.get("/ratings", params={"limit": limit}).status_code == 400
+    assert client.get("/ratings", params={"limit": 10_000}).status_code == 200
+
+
+def test_conditional_get(client, rating_payload):
+    first = client.get("/statistics")
+    assert first.status_code == 200
+
+    unchanged = client.get("/statistics", headers={"If-None-Match": first.headers["ETag"]})
+    assert unchanged.status_code == 304
+
+    client.post("/ratings", json=rating_payload)
+    changed = client.get("/statistics", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.json()["total_ratings"] == first.json()["total_ratings"] + 1
+
+
+def test_conditional_get_follows_the_window(client, monkeypatch):
+    first = client.get("/statistics", params={"days": 7})
+    assert client.get(
+        "/statistics", params={"days": 7}, headers={"If-None-Match": first.headers["ETag"]}
+    ).status_code == 304
+
+    # No new ratings, but an hour later the window covers different ones
+    later = Q.utcnow() + timedelta(hours=1)
+    monkeypatch.setattr(Q, "utcnow", lambda: later)
+    assert client.get(
+        "/statistics", params={"days": 7}, headers={"If-None-Match": first.headers["ETag"]}
+    ).status_code == 200
+
+
+def test_restaurant_summary(client, rating_payload):
+    rating_id = client.post("/ratings", json=rating_payload).json()["id"]
+    restaurant_id = next(
+        item["restaurant_id"] for item in client.get("/ratings", params={"limit": 500}).json()["items"]
+        if item["id"] == rating_id
+    )
+
+    summary = client.get(f"/restaurants/{restaurant_id}/summary").json()
+    assert summary["name"] == rating_payload["restaurant"]["name"]
+    assert summary["total_ratings"] >= 1
+    assert client.get("/restaurants/not-a-ulid/summary").status_code == 404
+
+
+def test_suggest_and_duplicate_restaurants(client, rating_payload):
+    client.post("/ratings", json=rating_payload)
+    suggestions = client.get("/restaurants/suggest", params={"q": "vovo tel"}).json()
+    assert suggestions[0]["name"] == rating_payload["restaurant"]["name"]
+
+    manual = {**rating_payload, "restaurant": {"name": "Vovo Telo Bakery"}}
+    response = client.post("/ratings", json=manual)
+    assert response.status_code == 409
+    assert response.json()["candidates"][0]["id"] == suggestions[0]["id"]
+
+    unknown = {**rating_payload, "restaurant": {"name": "Vovo Telo", "id": "01K2N4ZJ1V8Y6Q3W0QF9K3N5TB"}}
+    assert client.post("/ratings", json=unknown).status_code == 400
+    assert client.get("/restaurants/suggest", params={"q": "vovo", "limit": 0}).status_code == 400
@@ -0,0 +1,131 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+import time
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from ulid import ULID
+
+# =============== // MODULE IMPORT // ===============
+
+import cortado.datastructures as ds
+from cortado import Cortado
+from cortado.cache import (
+    FileCache,
+    PostgresCache,
+    RedisCache,
+    SharedCache,
+    bump_data_version,
+    get_data_version
+)
+
+
+class FakeRedis:
+    # Local stand-in for a redis-py client
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return Cortado().db.engine
+
+
+@pytest.fixture(params=["file", "redis", "postgres"])
+def shared_cache(request, tmp_path) -> SharedCache:
+    if request.param == "file":
+        return SharedCache(FileCache(tmp_path))
+    if request.param == "postgres":
+        # The table outlives the test, so keep to keys of our own
+        return SharedCache(PostgresCache(request.getfixturevalue("engine")), namespace=str(ULID()))
+    return SharedCache(RedisCache(FakeRedis()))
+
+
+def test_get_or_compute_only_computes_once_per_version(shared_cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"total_ratings": len(calls)}
+
+    assert shared_cache.get_or_compute("statistics", 1, compute) == {"total_ratings": 1}
+    assert shared_cache.get_or_compute("statistics", 1, compute) == {"total_ratings": 1}
+    assert shared_cache.get_or_compute("statistics", 2, compute) == {"total_ratings": 2}
+    assert len(calls) == 2
+
+
+def test_frame_codec_round_trip(shared_cache):
+    df = pd.DataFrame({"stars": [1, 5], "restaurant_name": ["Vovo Telo", None]})
+
+    shared_cache.get_or_compute("ratings", 1, lambda: df, codec="frame")
+    cached = shared_cache.get_or_compute("ratings", 1, lambda: pytest.fail("recomputed"), codec="frame")
+    pd.testing.assert_frame_equal(cached, df)
+
+
+def test_file_cache_expires(tmp_path):
+    cache = FileCache(tmp_path)
+    cache.set("fresh", b"coffee", ttl=60)
+    cache.set("stale", b"coffee", ttl=-1)
+
+    assert cache.get("fresh") == b"coffee"
+    assert cache.get("stale") is None
+
+
+def test_file_cache_purges_on_an_interval(tmp_path):
+    cache = FileCache(tmp_path, purge_interval=3600)
+    cache.set("fresh", b"coffee", ttl=60)
+    cache.set("stale", b"coffee", ttl=-1)
+    # The first set purged, the stale entry only goes once the interval is up
+    assert len(list(tmp_path.iterdir())) == 2
+    cache._last_purge -= 3600
+    cache.set("fresh", b"coffee", ttl=60)
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_postgres_cache_expires_and_purges_on_an_interval(engine):
+    prefix = str(ULID())
+    cache = PostgresCache(engine, purge_interval=3600)
+    cache._last_purge = time.monotonic()
+    cache.set(f"{prefix}:fresh", b"coffee", ttl=60)
+    cache.set(f"{prefix}:stale", b"coffee", ttl=-1)
+
+    def keys():
+        with Session(engine) as session:
+            return set(session.scalars(
+                select(ds.CacheEntry.key).where(ds.CacheEntry.key.startswith(prefix))
+            ))
+
+    # The stale entry waits for the interval, like FileCache
+    assert keys() == {f"{prefix}:fresh", f"{prefix}:stale"}
+    assert cache.get(f"{prefix}:fresh") == b"coffee"
+    cache._last_purge -= 3600
+    cache.set(f"{prefix}:other", b"coffee", ttl=-1)
+    assert keys() == {f"{prefix}:fresh"}
+
+
+def test_bump_data_version_without_postgres():
+    engine = create_engine("sqlite://")
+    ds.Base.metadata.create_all(engine, tables=[ds.DataVersion.__table__])
+    with Session(engine) as session:
+        assert [bump_data_version(session) for _ in range(3)] == [1, 2, 3]
+        assert get_data_version(session) == 3
@@ -8,13 +8,21 @@
 #
 # ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
 
+# =============== // STANDARD IMPORT // ===============
+
+import io
+import time
+from datetime import timedelta
+
 # =============== // LIBRARY IMPORT // ===============
 
 import pytest
+import pyarrow.parquet as pq
+from ulid import ULID
 
 # =============== // MODULE IMPORT // ===============
 
-from cortado import Cortado, DC
+from cortado import Cortado, DC, DS, Q
 
 
 def test_init():
@@ -47,3 +55,93 @@ def test_new_rating(location_data):
             cookie=True
         )
     )
+
+
+def test_get_ratings_since():
+    c = Cortado()
+    with c.db.get_session() as session:
+        restaurant = DS.Restaurant(name=f"Window {ULID()}")
+        user = DS.User(name="window")
+        inside = DS.Rating(restaurant=restaurant, user=user, stars=4, created_at=DS.utcnow() - timedelta(days=1))
+        outside = DS.Rating(restaurant=restaurant, user=user, stars=2, created_at=DS.utcnow() - timedelta(days=30))
+        session.add_all([inside, outside])
+        session.commit()
+        restaurant_id, inside_id, outside_id = restaurant.id, inside.id, outside.id
+
+    recent = c.get_ratings(since=Q.since_days(7), restaurant_id=restaurant_id)
+    assert [r["id"] for r in recent] == [inside_id]
+    everything = c.get_ratings(restaurant_id=restaurant_id)
+    assert sorted(r["id"] for r in everything) == sorted([inside_id, outside_id])
+    assert all(r["created_at"] >= Q.since_days(7) for r in c.get_ratings(since=Q.since_days(7)))
+
+
+def test_get_ratings_since_key():
+    c = Cortado()
+
+    ts = Q.since_days(30)
+    ratings = c.get_ratings_since_key(ts)
+    assert [r["id"] for r in ratings] == sorted(r["id"] for r in ratings)
+    assert all(ULID.from_str(r["id"]).milliseconds >= int(ts.timestamp() * 1000) for r in ratings)
+
+
+def test_export_ratings():
+    c = Cortado()
+
+    csv_data = b"".join(c.export_ratings(fmt="csv", batch_size=2)).decode()
+    assert csv_data.splitlines()[0].startswith("id,stars,price_zar")
+    assert len(csv_data.splitlines()) == len(c.get_ratings()) + 1
+
+    parquet_data = b"".join(c.export_ratings(fmt="parquet", batch_size=2))
+    assert pq.read_table(io.BytesIO(parquet_data)).num_rows == len(c.get_ratings())
+
+
+def test_new_rating_notifies_listener(location_data):
+    c = Cortado()
+    changes = []
+    listener = c.change_listener()
+    listener.subscribe(changes.append)
+    listener.start()
+    time.sleep(0.5)
+
+    c.new_rating(
+        restaurant=DC.Restaurant(
+            name=location_data["place_name"],
+            google_place_id=location_data["place_id"]
+        ),
+        user=DC.User(name="johan"),
+        rating=DC.Rating(stars=4, price_zar=32)
+    )
+    time.sleep(1)
+    listener.stop()
+
+    assert any(change["table"] == "rating" for change in changes)
+
+
+def test_listener_version_follows_callbacks():
+    listener = Cortado().change_listener()
+    seen = []
+    listener.subscribe(lambda change: seen.append(listener.version))
+    listener._dispatch({"table": "rating", "op": "insert"})
+    # Callbacks clear caches first, pollers only see the new version after
+    assert seen == [0] and listener.version == 1
+
+
+def test_restaurant_and_user_detail(location_data):
+    c = Cortado()
+    c.new_rating(
+        restaurant=DC.Restaurant(name=location_data["place_name"], google_place_id=location_data["place_id"]),
+        user=DC.User(name="johan"),
+        rating=DC.Rating(stars=4, price_zar=32.0, num_shots="double")
+    )
+    rating = c.get_ratings(limit=1, after_id=Q.ulid_floor(Q.since_days(1)))[0]
+
+    ratings = c.get_ratings(restaurant_id=rating["restaurant_id"])
+    assert ratings and all(r["restaurant_id"] == rating["restaurant_id"] for r in ratings)
+    assert all(r["user_id"] == rating["user_id"] for r in c.get_ratings(user_id=rating["user_id"]))
+
+    trend = c.get_rating_trend(restaurant_id=rating["restaurant_id"])
+    assert sum(t["ratings"] for t in trend) == len(ratings)
+    shots = c.get_shot_mix(user_id=rating["user_id"])
+    assert sum(s["ratings"] for s in shots) == c.get_user_summary(rating["user_id"])["total_ratings"]
+    with pytest.raises(ValueError):
+        c.get_shot_mix()
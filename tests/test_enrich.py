@@ -0,0 +1,83 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+import json
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pytest
+from ulid import ULID
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado import Cortado, DS
+from cortado.cache import REWRITES_VERSION
+from cortado.enrich import Geocoder, Place, RateLimiter, RetryableError, StubGeocoder, enrich, lookup_with_retries
+
+
+class Flaky(Geocoder):
+    def __init__(self, failures: int):
+        self.calls = 0
+        self.failures = failures
+
+    def lookup(self, name, address):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RetryableError("429")
+        return Place("flaky", 0.0, 0.0)
+
+
+def test_lookup_retries():
+    limiter = RateLimiter(per_second=0)
+    geocoder = Flaky(failures=2)
+    assert lookup_with_retries(geocoder, limiter, "x", None, backoff=0).google_place_id == "flaky"
+    assert geocoder.calls == 3
+
+    with pytest.raises(RetryableError):
+        lookup_with_retries(Flaky(failures=5), limiter, "x", None, attempts=3, backoff=0)
+
+
+def test_enrich_resolves_and_merges(tmp_path):
+    c = Cortado()
+    tag = str(ULID())
+    with c.db.get_session() as session:
+        user = DS.User(name=f"enrich-{tag}")
+        known = DS.Restaurant(name=f"Known {tag}", google_place_id=f"known-{tag}", latitude=-26.1, longitude=28.1)
+        duplicate = DS.Restaurant(name=f"Known typed in {tag}")
+        manual = DS.Restaurant(name=f"Manual {tag}", address="")
+        session.add_all([user, known, duplicate, manual])
+        session.flush()
+        session.add(DS.Rating(stars=4, user_id=user.id, restaurant_id=duplicate.id))
+        session.commit()
+        ids = known.id, duplicate.id, manual.id
+    rewrites = c.data_version(REWRITES_VERSION)
+
+    geocoder = StubGeocoder({
+        f"Known typed in {tag}": Place(f"known-{tag}", -26.1, 28.1),
+        f"Manual {tag}": Place(f"manual-{tag}", -33.9, 18.4, address="1 Long Street"),
+    }, fabricate=False)
+    checkpoint = tmp_path / "enrich.json"
+    result = enrich(c, geocoder, workers=4, per_second=0, batch_size=2, checkpoint=checkpoint)
+    assert result.resolved >= 1 and result.merged >= 1
+    assert json.loads(checkpoint.read_text())["last_id"] == result.last_id
+    assert c.data_version(REWRITES_VERSION) > rewrites
+
+    known_id, duplicate_id, manual_id = ids
+    with c.db.get_session() as session:
+        assert session.get(DS.Restaurant, duplicate_id) is None
+        assert session.query(DS.Rating).filter_by(restaurant_id=known_id).count() == 1
+        manual = session.get(DS.Restaurant, manual_id)
+        assert (manual.google_place_id, manual.latitude, manual.address) == (f"manual-{tag}", -33.9, "1 Long Street")
+
+    # Resuming from the checkpoint has nothing left to do
+    again = enrich(c, geocoder, per_second=0, checkpoint=checkpoint)
+    assert (again.resolved, again.merged) == (result.resolved, result.merged)
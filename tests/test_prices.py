@@ -0,0 +1,108 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+from decimal import Decimal
+
+# =============== // LIBRARY IMPORT // ===============
+
+import numpy as np
+import pandas as pd
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado import prices
+
+
+def ratings(rows: list[tuple[str, str, int, float | None, str | None]]) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            "restaurant_id": place,
+            "restaurant_name": place.title(),
+            "created_at": created_at,
+            "stars": stars,
+            "price_zar": price,
+            "num_shots": shots,
+        }
+        for place, created_at, stars, price, shots in rows
+    ])
+
+
+def test_price_arrays():
+    price = prices.as_prices([Decimal("30.10"), 20.2, None, 0, "n/a", -5])
+    assert np.isnan(price[[2, 4, 5]]).all() and price[3] == 0
+    assert prices.total_spent(price) == 50.3
+    assert prices.percentiles(price[:2], q=(50,)) == {50: 30.1 / 2 + 20.2 / 2}
+    assert np.isnan(prices.percentiles(price[[2, 4]], q=(50,))[50])
+
+    per_shot = prices.price_per_shot(np.array([30.0, 30.0, 30.0]), ["double", "triple", None])
+    assert per_shot[:2].tolist() == [15.0, 10.0] and np.isnan(per_shot[2])
+    value = prices.value_score([4, 5, 3], np.array([20.0, 40.0, 0.0]))
+    assert value[:2].tolist() == [0.2, 0.125] and np.isnan(value[2])
+
+
+def test_price_aggregates():
+    df = ratings([
+        ("bean", "2025-01-03", 4, 20.0, "single"),
+        ("bean", "2025-01-20", 5, 22.0, "double"),
+        ("bean", "2025-03-01", 4, 25.0, "double"),
+        ("crema", "2025-01-05", 5, 40.0, "double"),
+        ("crema", "2025-02-05", 3, None, "single"),
+    ])
+    priced = prices.frame(df)
+
+    restaurants = prices.restaurant_prices(priced).set_index("restaurant_id")
+    assert restaurants.loc["bean", "ratings"] == 3
+    assert restaurants.loc["crema", "median_price"] == 40.0
+    assert restaurants["value"].idxmax() == "bean"
+
+    shots = prices.shot_prices(priced).set_index("num_shots")
+    assert shots.loc["double", "median"] == 12.5
+    assert shots.loc["single", "ratings"] == 1
+
+    drift = prices.price_drift(priced).set_index(["restaurant_id", "period"])
+    assert drift.loc[("bean", pd.Timestamp("2025-01-01")), "median_price"] == 21.0
+    assert round(drift.loc[("bean", pd.Timestamp("2025-03-01")), "drift_pct"], 2) == 19.05
+    assert (drift.xs("crema")["drift_pct"] == 0).all()
+
+    histogram = prices.histogram(prices.as_prices(df["price_zar"]), bins=4)
+    assert histogram["ratings"].sum() == 4
+
+
+def test_shot_prices_without_shot_sizes():
+    priced = prices.frame(ratings([
+        ("bean", "2025-01-03", 4, 20.0, None),
+        ("crema", "2025-01-05", 5, 40.0, None),
+    ]))
+    shots = prices.shot_prices(priced)
+    assert shots.empty
+    assert list(shots.columns) == ["num_shots", "p25", "median", "p75", "ratings"]
+
+
+def test_price_star_bins():
+    rng = np.random.default_rng(7)
+    n = 50_000
+    priced = prices.frame(pd.DataFrame({
+        "restaurant_id": rng.integers(0, 5_000, n).astype(str),
+        "restaurant_name": "Cafe",
+        "created_at": "2025-01-01",
+        "stars": rng.integers(1, 6, n),
+        "price_zar": np.append(rng.normal(35, 5, n - 1), 3_000.0),
+        "num_shots": "double",
+    }))
+
+    bins = prices.price_star_bins(priced, bins=20)
+    # Bounded by bins x stars, with every rating counted once
+    assert len(bins) <= 20 * 5
+    assert bins["ratings"].sum() == n
+    # The outlier lands in the top bin instead of stretching the axis
+    assert bins["price"].max() < 100
+    assert prices.price_star_bins(priced.iloc[:0]).empty
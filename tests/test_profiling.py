@@ -0,0 +1,69 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+import pstats
+import time
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pytest
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado import profiling
+
+
+def slow(n):
+    return sum(i * i for i in range(n))
+
+
+def busy():
+    for _ in range(3):
+        slow(200_000)
+    return slow(10)
+
+
+def test_profiler_report(tmp_path):
+    with pytest.raises(RuntimeError):
+        with profiling.Profiler(tmp_path, name="test") as profiler:
+            busy()
+            raise RuntimeError("like st.stop()")
+
+    report = profiler.report
+    assert report.path.parent == tmp_path and report.path.suffix == ".prof"
+    assert pstats.Stats(str(report.path)).total_tt > 0
+    assert "busy" in " ".join(report.functions["function"])
+    assert report.functions["own_s"].is_monotonic_decreasing
+
+    # Every node fits inside its parent, as the icicle chart needs
+    tree = report.tree.set_index("id")
+    children = tree[tree["parent"] != ""].groupby("parent")["seconds"].sum()
+    assert (children <= tree.loc[children.index, "seconds"] * (1 + 1e-9)).all()
+    [slow_node] = tree.index[tree["function"].str.startswith("slow (")]
+    assert "/busy (" in slow_node
+
+
+def test_profiler_keeps_the_latest(tmp_path):
+    for _ in range(4):
+        with profiling.Profiler(tmp_path, name="test", keep=2) as profiler:
+            slow(10)
+        time.sleep(0.002)
+    assert sorted(tmp_path.glob("test-*.prof"))[-1] == profiler.report.path
+    assert len(list(tmp_path.glob("test-*.prof"))) == 2
+
+
+def test_enabled(monkeypatch):
+    monkeypatch.delenv("CORTADO_PROFILE", raising=False)
+    assert not profiling.enabled({})
+    assert profiling.enabled({"profile": "1"})
+    monkeypatch.setenv("CORTADO_PROFILE", "1")
+    assert profiling.enabled({})
@@ -0,0 +1,122 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // STANDARD IMPORT // ===============
+
+from datetime import datetime, timedelta, timezone
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pandas as pd
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado import Cortado, DC
+from cortado.datastructures import ulid_floor
+from cortado.recommend import Recommender
+
+START = datetime(2025, 8, 1, tzinfo=timezone.utc)
+
+PLACES = {
+    "espresso-bar": ("Espresso Bar", -33.92, 18.42),
+    "roastery": ("Roastery", -33.93, 18.43),
+    "tea-room": ("Tea Room", -33.92, 18.41),
+    "far-away": ("Far Away", -26.20, 28.04),
+}
+
+
+def frame(rows: list[tuple[str, str, int]], start: int = 0) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            # One rating a second, in id order
+            "id": ulid_floor(START + timedelta(seconds=start + i)),
+            "user_id": user,
+            "user_name": user,
+            "restaurant_id": place,
+            "restaurant_name": PLACES[place][0],
+            "latitude": PLACES[place][1],
+            "longitude": PLACES[place][2],
+            "stars": stars,
+        }
+        for i, (user, place, stars) in enumerate(rows)
+    ])
+
+
+def test_recommends_similar_restaurants():
+    # Everyone who loves the espresso bar loves the roastery and hates tea
+    recommender = Recommender().fit(frame([
+        ("anna", "espresso-bar", 5), ("anna", "roastery", 5), ("anna", "tea-room", 1),
+        ("ben", "espresso-bar", 5), ("ben", "roastery", 4), ("ben", "tea-room", 2),
+        ("cara", "tea-room", 5), ("cara", "far-away", 4),
+        ("dan", "espresso-bar", 5),
+    ]))
+
+    top = recommender.recommend("dan", k=3)
+    assert top[0]["restaurant_id"] == "roastery"
+    assert "espresso-bar" not in {r["restaurant_id"] for r in top}
+
+    near = recommender.recommend("dan", k=3, near=(-33.92, 18.42), radius_km=5)
+    assert "far-away" not in {r["restaurant_id"] for r in near}
+    assert all(r["distance_km"] <= 5 for r in near)
+
+    # Strangers fall back to popularity
+    assert recommender.recommend("nobody", k=1)
+
+
+def test_update_matches_fit():
+    rows = [
+        ("anna", "espresso-bar", 5), ("anna", "roastery", 5),
+        ("ben", "espresso-bar", 4), ("ben", "roastery", 5), ("ben", "tea-room", 1),
+        ("dan", "espresso-bar", 5),
+    ]
+    fitted = Recommender().fit(frame(rows))
+
+    incremental = Recommender().fit(frame(rows[:2]))
+    incremental.update(frame(rows[2:], start=2))
+
+    assert incremental.last_id == fitted.last_id
+    assert [r["restaurant_id"] for r in incremental.recommend("dan")] == \
+        [r["restaurant_id"] for r in fitted.recommend("dan")]
+
+
+def test_update_skips_ratings_it_has_seen():
+    ratings = frame([
+        ("anna", "espresso-bar", 5), ("anna", "roastery", 5),
+        ("ben", "espresso-bar", 4), ("ben", "roastery", 5),
+    ])
+    fitted = Recommender().fit(ratings)
+
+    # The catch-up re-reads the overlap, then a late commit with an older id
+    # turns up
+    incremental = Recommender().fit(ratings.iloc[[0, 2, 3]])
+    incremental.update(ratings.iloc[[0, 2, 3]])
+    incremental.update(ratings.iloc[[1]])
+
+    assert incremental.recent_ids == set(ratings["id"])
+    assert incremental.updates == 1
+    assert incremental.last_id == fitted.last_id
+    assert incremental.catch_up_id() < ratings["id"].min()
+    counts = dict(zip(incremental.restaurant_ids, incremental.star_count))
+    assert counts == dict(zip(fitted.restaurant_ids, fitted.star_count))
+
+
+def test_cortado_recommend(location_data):
+    c = Cortado()
+    c.new_rating(
+        restaurant=DC.Restaurant(name=location_data["place_name"], google_place_id=location_data["place_id"]),
+        user=DC.User(name="johan"),
+        rating=DC.Rating(stars=5, price_zar=30.0)
+    )
+    recommendations = c.recommend(DC.User(name="johan"), k=5)
+    assert len(recommendations) <= 5
+
+    user_id = c.recommender().user_by_name["johan"]
+    rated = {r["restaurant_id"] for r in c.get_ratings(user_id=user_id)}
+    assert not rated & {r["restaurant_id"] for r in recommendations}
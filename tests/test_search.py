@@ -0,0 +1,74 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pytest
+from ulid import ULID
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado import Cortado, DC, DuplicateRestaurant, UnknownRestaurant
+from cortado.search import RestaurantIndex
+
+RESTAURANTS = [
+    {"id": "1", "name": "Vovo Telo Bakery & Café", "address": "Waterfall, Midrand"},
+    {"id": "2", "name": "Bean There Coffee", "address": "Braamfontein, Johannesburg"},
+    {"id": "3", "name": "Truth Coffee Roasting", "address": "Buitenkant Street, Cape Town"},
+    {"id": "4", "name": "Café Rosetta", "address": "Woodstock, Cape Town"},
+]
+
+
+def test_suggest_and_duplicates():
+    index = RestaurantIndex().add(RESTAURANTS).add(RESTAURANTS[:1])
+    assert len(index) == 4
+
+    # Half typed, missing accents and by address
+    assert index.suggest("vovo te")[0]["id"] == "1"
+    assert index.suggest("cafe ros")[0]["id"] == "4"
+    assert index.suggest("woodstock")[0]["id"] == "4"
+    assert index.suggest("   ") == []
+
+    assert [r["id"] for r in index.duplicates("Vovo Telo")] == ["1"]
+    assert [r["id"] for r in index.duplicates("Truth Coffee")] == ["3"]
+    # Short, common words are in too many names to count as a duplicate
+    assert index.duplicates("Café") == []
+
+
+def test_new_rating_flags_duplicates():
+    c = Cortado()
+    # Random enough that earlier runs against the same database don't match
+    tag = str(ULID()).lower()
+    name = f"Motherland {tag}"
+    user, rating = DC.User(name="johan"), DC.Rating(stars=4, price_zar=32.0)
+    c.new_rating(restaurant=DC.Restaurant(name=name), user=user, rating=rating)
+
+    # The same name again is the same place, not a duplicate
+    c.new_rating(restaurant=DC.Restaurant(name=name.upper()), user=user, rating=rating)
+    [suggestion] = [s for s in c.suggest_restaurants(tag) if s["name"] == name]
+
+    with pytest.raises(DuplicateRestaurant) as e:
+        c.new_rating(restaurant=DC.Restaurant(name=f"Motherland {tag} Rosebank"), user=user, rating=rating)
+    assert [candidate["id"] for candidate in e.value.candidates] == [suggestion["id"]]
+
+    # Picking the candidate, or saying it's new, both go through
+    c.new_rating(restaurant=DC.Restaurant(name=name, id=suggestion["id"]), user=user, rating=rating)
+    c.new_rating(
+        restaurant=DC.Restaurant(name=f"Motherland {tag} Rosebank"),
+        user=user,
+        rating=rating,
+        allow_new_restaurant=True
+    )
+    assert c.get_restaurant_summary(suggestion["id"])["total_ratings"] == 3
+
+    # The page passes ids through as they are, a bad one is just unknown
+    for restaurant_id in ("not-a-ulid", str(ULID())):
+        with pytest.raises(UnknownRestaurant):
+            c.new_rating(restaurant=DC.Restaurant(name=name, id=restaurant_id), user=user, rating=rating)
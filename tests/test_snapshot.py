@@ -0,0 +1,77 @@
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+#      /\_/\
+#     ( o.o )
+#      > ^ <
+#
+# Author: Johan Hanekom
+# Date: August 2025
+#
+# ~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~^~
+
+# =============== // LIBRARY IMPORT // ===============
+
+import pandas as pd
+
+# =============== // MODULE IMPORT // ===============
+
+from cortado import Cortado, DC
+from cortado.cache import REWRITES_VERSION
+from cortado.snapshot import load_ratings, read_snapshot, write_snapshot, write_snapshot_in_background
+
+
+def test_read_missing_snapshot(tmp_path):
+    assert read_snapshot(tmp_path / "ratings.arrow") is None
+    (tmp_path / "garbage.arrow").write_bytes(b"not arrow")
+    assert read_snapshot(tmp_path / "garbage.arrow") is None
+
+
+def test_snapshot_catches_up(tmp_path, location_data):
+    c = Cortado()
+    path = tmp_path / "ratings.arrow"
+
+    df, version = load_ratings(c, path)
+    assert len(df) == len(c.get_ratings())
+
+    # Wait for the background write, then add a rating behind its back
+    write_snapshot_in_background(df, version, c.data_version(REWRITES_VERSION), path).join()
+    [rating_id] = c.new_ratings([(
+        DC.Restaurant(name=location_data["place_name"], google_place_id=location_data["place_id"]),
+        DC.User(name="johan"),
+        DC.Rating(stars=5, price_zar=30.0)
+    )])
+
+    snapshot = read_snapshot(path)
+    assert snapshot.data_version == version
+    assert len(snapshot.df) == len(df)
+
+    caught_up, new_version = load_ratings(c, path)
+    assert new_version > version
+    assert len(caught_up) == len(df) + 1
+    assert caught_up["id"].is_unique
+    assert rating_id in set(caught_up["id"])
+
+
+class EmptyCortado:
+    # Just what load_ratings needs, starting from a database with no ratings
+    def __init__(self):
+        self.ratings = []
+
+    def data_version(self, name=None):
+        return 0 if name == REWRITES_VERSION else len(self.ratings)
+
+    def get_ratings(self, after_id=None):
+        return [r for r in self.ratings if after_id is None or r["id"] > after_id]
+
+
+def test_snapshot_from_an_empty_database(tmp_path):
+    c = EmptyCortado()
+    path = tmp_path / "ratings.arrow"
+
+    df, _ = load_ratings(c, path)
+    assert df.empty and read_snapshot(path) is None
+
+    # A column-less file from before this was guarded is ignored as well
+    write_snapshot(pd.DataFrame([]), 0, 0, path)
+    c.ratings.append({"id": "01K2N4ZJ1V8Y6Q3W0QF9K3N5TB", "stars": 4})
+    df, version = load_ratings(c, path)
+    assert list(df["id"]) == ["01K2N4ZJ1V8Y6Q3W0QF9K3N5TB"] and version == 1